@@ -44,7 +44,7 @@ def check_version():
 
 def check_rawterm_units():
     """rawterm Color, Style, Key, Box -- no terminal required."""
-    from rawterm import Style, Color, Key, Box, NAMED_COLORS
+    from rawterm import Style, Color, Key, Box, NAMED_COLORS, Region, STYLE_DEFAULT
 
     # Color construction and equality
     c1 = Color.RED
@@ -112,6 +112,29 @@ def check_rawterm_units():
         assert name in NAMED_COLORS, "missing " + name
         assert "bright" + name in NAMED_COLORS, "missing bright" + name
 
+    # Region cell round-trips, on a region not attached to a terminal
+    style = Style(fg=Color.WHITE, bg=Color.BLUE)
+    reg = Region(None, 2, 6, 0, 0)
+    reg.fill(style)
+    assert reg.cell(1, 5) == (" ", style), "region fill"
+    assert reg.write(0, 0, "ab", Style(bold=True)) == 2, "region write width"
+    assert reg.cell(0, 1) == ("b", Style(bold=True)), "region write"
+    assert reg.cell(0, 2) == (" ", style), "region write bounds"
+    reg.write_char(1, 0, Box.VLINE)
+    assert reg.cell(1, 0) == (Box.VLINE, STYLE_DEFAULT), "region write_char"
+
+    # Wide characters take two cells, the second one a placeholder
+    assert reg.write(0, 2, "\u4e2d", style) == 2, "wide char width"
+    assert reg.cell(0, 2) == ("\u4e2d", style), "wide char"
+    assert reg.cell(0, 3) == ("", style), "wide char placeholder"
+    assert reg.write(0, 5, "\u4e2d") == 0, "wide char clipped at edge"
+    assert reg.cell(0, 5) == (" ", style), "clipped wide char not written"
+    assert reg.write(1, 1, "ab\u4e2d", max_len=3) == 2, "wide char max_len"
+    assert reg.cell(1, 3) == (" ", style), "wide char past max_len not written"
+
+    reg.clear()
+    assert reg.cell(0, 3) == (" ", style), "region clear"
+
     print("rawterm unit checks passed")
 
 
@@ -249,9 +272,9 @@ def check_terminal_init():
     reg.fill(Style(fg=Color.WHITE, bg=Color.BLACK))
     reg.write(0, 0, "test")
     reg.write_char(1, 0, Box.HLINE)
-    assert reg._cells[0][0][0] == "t", "region write"
+    assert reg.cell(0, 0)[0] == "t", "region write"
     reg.clear()
-    assert reg._cells[0][0][0] == " ", "region clear"
+    assert reg.cell(0, 0)[0] == " ", "region clear"
     reg.move(1, 2)
     assert reg.y == 1 and reg.x == 2, "region move"
     reg.resize(5, 20)
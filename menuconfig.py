@@ -581,6 +581,10 @@ def _needs_save():
 #     from the save dialog.
 
 
+# rawterm.Terminal instance, set while the interface is running
+_term = None
+
+
 def _menuconfig(term):
     # Logic for the main display, with the list of symbols, etc.
 
@@ -931,14 +935,6 @@ def _resize_main():
         _menu_scroll = _sel_node_i - menu_height + 1
 
 
-def _height(win):
-    return win.height
-
-
-def _width(win):
-    return win.width
-
-
 def _enter_menu(menu):
     # Makes 'menu' the currently displayed menu. In addition to actual 'menu's,
     # "menu" here includes choices and symbols defined with the 'menuconfig'
@@ -1070,7 +1066,7 @@ def _leave_menu():
 
     if _parent_screen_rows:
         # The terminal might have shrunk since we were last in the parent menu
-        screen_row = min(_parent_screen_rows.pop(), _height(_menu_win) - 1)
+        screen_row = min(_parent_screen_rows.pop(), _menu_win.height - 1)
         _menu_scroll = max(_sel_node_i - screen_row, 0)
     else:
         # No saved parent menu locations, meaning we jumped directly to some
@@ -1092,10 +1088,11 @@ def _select_next_menu_entry():
         # If the new node is sufficiently close to the edge of the menu window
         # (as determined by _SCROLL_OFFSET), increase the scroll by one. This
         # gives nice and non-jumpy behavior even when
-        # _SCROLL_OFFSET >= _height(_menu_win).
-        if _sel_node_i >= _menu_scroll + _height(
-            _menu_win
-        ) - _SCROLL_OFFSET and _menu_scroll < _max_scroll(_shown, _menu_win):
+        # _SCROLL_OFFSET >= _menu_win.height.
+        if (
+            _sel_node_i >= _menu_scroll + _menu_win.height - _SCROLL_OFFSET
+            and _menu_scroll < _max_scroll(_shown, _menu_win)
+        ):
 
             _menu_scroll += 1
 
@@ -1188,7 +1185,7 @@ def _center_vertically():
     global _menu_scroll
 
     _menu_scroll = min(
-        max(_sel_node_i - _height(_menu_win) // 2, 0), _max_scroll(_shown, _menu_win)
+        max(_sel_node_i - _menu_win.height // 2, 0), _max_scroll(_shown, _menu_win)
     )
 
 
@@ -1198,11 +1195,11 @@ def _draw_main():
     # shadow.
 
     screen_width = _term.width
-    dlg_h = _height(_dialog_win)
-    dlg_w = _width(_dialog_win)
+    dlg_h = _dialog_win.height
+    dlg_w = _dialog_win.width
 
-    menu_height = _height(_menu_win)
-    menu_width = _width(_menu_win)
+    menu_height = _menu_win.height
+    menu_width = _menu_win.width
 
     # --- Compute inner box position within the dialog ---
     # These must match _resize_main() calculations.
@@ -1251,8 +1248,9 @@ def _draw_main():
         hline_start = 1
 
     # Fill rest of row 1 with horizontal line
-    for j in range(hline_start, screen_width - 1):
-        _screen_win.write_char(1, j, Box.HLINE, screen_style)
+    _screen_win.write(
+        1, hline_start, Box.HLINE * (screen_width - 1 - hline_start), screen_style
+    )
 
     # Mode indicators on screen background (show-name/show-all/show-help)
     enabled_modes = []
@@ -1368,17 +1366,12 @@ def _draw_main():
         node = _shown[_sel_node_i]
         sh_style = _style["show-help"]
         if isinstance(node.item, (Symbol, Choice)) and node.help:
-            help_lines = textwrap.wrap(node.help, _width(_help_win))
-            for i in range(min(_height(_help_win), len(help_lines))):
+            help_lines = textwrap.wrap(node.help, _help_win.width)
+            for i in range(min(_help_win.height, len(help_lines))):
                 _help_win.write(i, 0, help_lines[i], sh_style)
         else:
             _help_win.write(0, 0, "(no help)", sh_style)
 
-    # ---------------------------------------------------------------
-    # 5. Shadow
-    # ---------------------------------------------------------------
-    _refresh_shadow_windows(_dlg_bottom_shadow, _dlg_right_shadow)
-
 
 def _draw_scroll_arrows(
     win, item_count, scroll, box_y, x, menu_height, menubox_style, border_style
@@ -1395,7 +1388,7 @@ def _draw_scroll_arrows(
         win.write(box_y, x + 1, "(-)", border_style)
     else:
         for j in range(4):
-            if x + j < _width(win) - 1:
+            if x + j < win.width - 1:
                 win.write_char(box_y, x + j, Box.HLINE, menubox_style)
 
     # Down arrow position: box_y + menu_height + 1 row, at x
@@ -1405,7 +1398,7 @@ def _draw_scroll_arrows(
         win.write(down_y, x + 1, "(+)", border_style)
     else:
         for j in range(4):
-            if x + j < _width(win) - 1:
+            if x + j < win.width - 1:
                 win.write_char(down_y, x + j, Box.HLINE, border_style)
 
 
@@ -1693,7 +1686,7 @@ def _input_dialog(title, initial_text, info_text=None):
         i = len(initial_text)
 
         def edit_width():
-            return _width(win) - 4
+            return win.width - 4
 
         # Horizontal scroll offset
         hscroll = max(i - edit_width() + 1, 0)
@@ -1707,8 +1700,6 @@ def _input_dialog(title, initial_text, info_text=None):
 
             _draw_input_dialog(win, title, info_lines, s, i, hscroll)
 
-            _refresh_shadow_windows(bottom_shadow, right_shadow)
-
             _term.update()
 
             c = _term.read_key()
@@ -1758,7 +1749,7 @@ def _resize_input_dialog(win, title, info_lines):
 
 
 def _draw_input_dialog(win, title, info_lines, s, i, hscroll):
-    edit_width = _width(win) - 4
+    edit_width = win.width - 4
 
     win.clear()
 
@@ -1771,7 +1762,7 @@ def _draw_input_dialog(win, title, info_lines, s, i, hscroll):
     visible_s = s[hscroll : hscroll + edit_width]
     win.write(2, 2, visible_s + " " * (edit_width - len(visible_s)), _style["edit"])
 
-    max_info_rows = max(_height(win) - 5, 0)
+    max_info_rows = max(win.height - 5, 0)
     for linenr, line in enumerate(info_lines):
         if linenr >= max_info_rows:
             break
@@ -1925,14 +1916,17 @@ def _key_dialog(title, text, keys):
         _resize_key_dialog(win, text)
 
         bottom_shadow, right_shadow = _create_shadow_for_win(win)
-        while True:
-            _draw_main()
 
-            _draw_key_dialog(win, title, text)
+        # Keys that don't close the dialog leave it unchanged, so it is only
+        # cleared and redrawn initially and after a resize
+        redraw = True
 
-            _refresh_shadow_windows(bottom_shadow, right_shadow)
-
-            _term.update()
+        while True:
+            if redraw:
+                redraw = False
+                _draw_main()
+                _draw_key_dialog(win, title, text)
+                _term.update()
 
             c = _term.read_key()
 
@@ -1941,6 +1935,7 @@ def _key_dialog(title, text, keys):
                 _resize_key_dialog(win, text)
                 _close_shadow_windows(bottom_shadow, right_shadow)
                 bottom_shadow, right_shadow = _create_shadow_for_win(win)
+                redraw = True
 
             elif c == "\x1b":  # \x1B = ESC
                 return None
@@ -1977,14 +1972,19 @@ def _draw_key_dialog(win, title, text):
 
     # Draw text content inside the frame, clamped to the interior so that
     # border characters are never overwritten on small terminals.
-    text_width = max(_width(win) - 4, 0)
-    max_rows = max(_height(win) - 3, 0)
+    text_width = max(win.width - 4, 0)
+    max_rows = max(win.height - 3, 0)
     for i, line in enumerate(text.split("\n")):
         if i >= max_rows:
             break
         win.write(2 + i, 2, line[:text_width], _style["body"])
 
 
+# How far each selection-moving key in _button_dialog() moves the selected
+# button (Tab/Right: next, Left: previous)
+_BUTTON_MOVES = {"\t": 1, Key.RIGHT: 1, Key.LEFT: -1}
+
+
 def _button_dialog(title, text, buttons, default_button=0):
     # Dialog with button selection support, matching lxdialog's yesno/msgbox
     #
@@ -2015,8 +2015,16 @@ def _button_dialog(title, text, buttons, default_button=0):
         button_row_width = sum(len(b) + 2 for b in buttons) + spacing * (
             len(buttons) - 1
         )
+        # Offset of each button within the button row. Neither the labels
+        # nor the spacing change while the dialog is open.
+        button_offsets = []
+        offset = 0
+        for button_label in buttons:
+            button_offsets.append(offset)
+            offset += len(button_label) + 2 + spacing
+        max_line_len = max(len(line) for line in lines)
         win_width = min(
-            max(max(len(line) for line in lines) + 4, button_row_width + 4),
+            max(max_line_len + 4, button_row_width + 4),
             _term.width - 4,
         )
 
@@ -2027,54 +2035,62 @@ def _button_dialog(title, text, buttons, default_button=0):
 
         body_style = _style["body"]
 
+        # Everything except the buttons only changes when the terminal is
+        # resized. Other keys just move the selection, so only the button
+        # row is redrawn for them.
+        redraw = True
+
         while True:
-            # Draw main display behind dialog
-            _draw_main()
+            if redraw:
+                redraw = False
 
-            win.clear()
+                # Draw main display behind dialog
+                _draw_main()
 
-            _draw_box(win, 0, 0, win_height, win_width, body_style, body_style)
+                win.clear()
 
-            _draw_title(win, title, win_width)
+                _draw_box(win, 0, 0, win_height, win_width, body_style, body_style)
 
-            _draw_separator(win, win_height - 3, win_width)
+                _draw_title(win, title, win_width)
 
-            # Draw text content, clamped to the interior above the separator
-            text_width = win_width - 4
-            max_text_rows = win_height - 4
-            for i, line in enumerate(lines):
-                if i >= max_text_rows:
-                    break
-                win.write(1 + i, 2, line[:text_width], body_style)
+                _draw_separator(win, win_height - 3, win_width)
+
+                # Draw text content, clamped to the interior above the
+                # separator
+                text_width = win_width - 4
+                max_text_rows = win_height - 4
+                for i, line in enumerate(lines):
+                    if i >= max_text_rows:
+                        break
+                    win.write(1 + i, 2, line[:text_width], body_style)
+
+                # Buttons go at row (height - 2), using the same spacing
+                # computed for initial sizing above.  Clamp x to protect the
+                # left border on narrow terminals.
+                button_y = win_height - 2
+                row_x = max((win_width - button_row_width) // 2, 1)
+                button_xs = [row_x + offset for offset in button_offsets]
 
-            # Draw buttons at row (height - 2), using the same spacing
-            # computed for initial sizing above.  Clamp x to protect the
-            # left border on narrow terminals.
-            button_y = win_height - 2
-            current_x = max((win_width - button_row_width) // 2, 1)
             for i, button_label in enumerate(buttons):
                 _print_button(
-                    win,
-                    button_label,
-                    button_y,
-                    current_x,
-                    i == selected_button,
+                    win, button_label, button_y, button_xs[i], i == selected_button
                 )
-                current_x += len(button_label) + 2 + spacing
-
-            _refresh_shadow_windows(bottom_shadow, right_shadow)
 
             _term.update()
 
             # Handle input
             c = _term.read_key()
 
-            if c == Key.RESIZE:
+            move = _BUTTON_MOVES.get(c)
+            if move is not None:
+                selected_button = (selected_button + move) % len(buttons)
+
+            elif c == Key.RESIZE:
                 _resize_main()
                 # Recompute dimensions for new terminal size
                 win_height = min(len(lines) + 5, _term.height - 4)
                 win_width = min(
-                    max(max(len(line) for line in lines) + 4, button_row_width + 4),
+                    max(max_line_len + 4, button_row_width + 4),
                     _term.width - 4,
                 )
                 win.resize(win_height, win_width)
@@ -2084,16 +2100,11 @@ def _button_dialog(title, text, buttons, default_button=0):
                 )
                 _close_shadow_windows(bottom_shadow, right_shadow)
                 bottom_shadow, right_shadow = _create_shadow_for_win(win)
+                redraw = True
 
             elif c == "\x1b":  # ESC
                 return None
 
-            elif c in ("\t", Key.RIGHT):  # Tab/Right
-                selected_button = (selected_button + 1) % len(buttons)
-
-            elif c == Key.LEFT:
-                selected_button = (selected_button - 1) % len(buttons)
-
             elif c in (" ", "\n"):  # Space/Enter
                 return selected_button
 
@@ -2116,7 +2127,6 @@ def _print_button(win, label, y, x, selected):
 
     # Count leading spaces
     leading_spaces = len(label) - len(label.lstrip(" "))
-    label_stripped = label.lstrip(" ")
 
     # Resolve style suffix once: "active" or "inactive"
     sfx = "active" if selected else "inactive"
@@ -2127,14 +2137,11 @@ def _print_button(win, label, y, x, selected):
     # Draw bracket "<"
     win.write(y, x, "<", btn_style)
 
-    # Draw leading spaces with label style
-    if leading_spaces:
-        win.write(y, x + 1, " " * leading_spaces, lbl_style)
-
-    # Draw first character (hotkey) with key style, then rest with label style
-    if label_stripped:
-        win.write_char(y, x + 1 + leading_spaces, label_stripped[0], key_style)
-        win.write(y, x + 1 + leading_spaces + 1, label_stripped[1:], lbl_style)
+    # Draw the whole label with label style, then restyle the first
+    # non-space character (hotkey) with key style
+    win.write(y, x + 1, label, lbl_style)
+    if leading_spaces < len(label):
+        win.write_char(y, x + 1 + leading_spaces, label[leading_spaces], key_style)
 
     # Draw bracket ">"
     win.write(y, x + 1 + len(label), ">", btn_style)
@@ -2154,11 +2161,21 @@ def _draw_box(win, y, x, height, width, box_style, border_style):
 
     last_row = y + height - 1
     last_col = x + width - 1
+    hline = Box.HLINE * (width - 2)
+
+    if border_style is box_style and width >= 2:
+        # Single-style boxes (all popup dialogs) are drawn one whole row per
+        # write, with the interior row built once
+        win.write(y, x, Box.ULCORNER + hline + Box.URCORNER, box_style)
+        row = Box.VLINE + " " * (width - 2) + Box.VLINE
+        for i in range(y + 1, last_row):
+            win.write(i, x, row, box_style)
+        win.write(last_row, x, Box.LLCORNER + hline + Box.LRCORNER, box_style)
+        return
 
     # Top row
     win.write_char(y, x, Box.ULCORNER, border_style)
-    for j in range(x + 1, last_col):
-        win.write_char(y, j, Box.HLINE, border_style)
+    win.write(y, x + 1, hline, border_style)
     win.write_char(y, last_col, Box.URCORNER, box_style)
 
     # Interior rows
@@ -2170,8 +2187,7 @@ def _draw_box(win, y, x, height, width, box_style, border_style):
 
     # Bottom row
     win.write_char(last_row, x, Box.LLCORNER, border_style)
-    for j in range(x + 1, last_col):
-        win.write_char(last_row, j, Box.HLINE, box_style)
+    win.write(last_row, x + 1, hline, box_style)
     win.write_char(last_row, last_col, Box.LRCORNER, box_style)
 
 
@@ -2197,8 +2213,7 @@ def _draw_separator(win, y, width):
     # relies on ncurses ACS rendering that raw terminal output cannot match).
     body_s = _style["body"]
     win.write_char(y, 0, Box.LTEE, body_s)
-    for j in range(1, width - 1):
-        win.write_char(y, j, Box.HLINE, body_s)
+    win.write(y, 1, Box.HLINE * (width - 2), body_s)
     win.write_char(y, width - 1, Box.RTEE, body_s)
 
 
@@ -2247,6 +2262,9 @@ def _create_shadow_windows(y, x, height, width, right_y_offset=1):
     # Create shadow regions for bottom and right edges
     # Returns tuple of (bottom_shadow, right_shadow)
     #
+    # The regions are filled once here and composited by _term.update() on
+    # every frame, so they never need redrawing.
+    #
     # Based on lxdialog's draw_shadow():
     # - Bottom: at y + height, from x + 2, width chars
     # - Right: from y + right_y_offset to y + height (inclusive), at x + width, 2 chars wide
@@ -2291,17 +2309,6 @@ def _close_shadow_windows(bottom_shadow, right_shadow):
                 pass
 
 
-def _refresh_shadow_windows(bottom_shadow, right_shadow):
-    # Shadow regions are composited automatically by _term.update().
-    # Just clear and refill them to ensure correct content.
-    for shadow in (bottom_shadow, right_shadow):
-        if shadow:
-            try:
-                shadow.clear()
-            except Exception:
-                pass
-
-
 def _draw_frame(win, title):
     # Draw a frame around the inner edges of 'win', with 'title' at the top.
 
@@ -2369,9 +2376,10 @@ def _jump_to_dialog():
             if sel_node_i == len(matches) - 1:
                 return sel_node_i, scroll
 
-            if sel_node_i + 1 >= scroll + _height(
-                matches_win
-            ) - _SCROLL_OFFSET and scroll < _max_scroll(matches, matches_win):
+            if (
+                sel_node_i + 1 >= scroll + matches_win.height - _SCROLL_OFFSET
+                and scroll < _max_scroll(matches, matches_win)
+            ):
 
                 return sel_node_i + 1, scroll + 1
 
@@ -2479,9 +2487,6 @@ def _jump_to_dialog():
                 scroll,
             )
 
-            # Refresh shadow windows after all other windows
-            _refresh_shadow_windows(bottom_shadow, right_shadow)
-
             _term.update()
 
             c = _term.read_key()
@@ -2546,7 +2551,7 @@ def _jump_to_dialog():
                 pass
 
             else:
-                s, s_i, hscroll = _edit_text(c, s, s_i, hscroll, _width(edit_box) - 2)
+                s, s_i, hscroll = _edit_text(c, s, s_i, hscroll, edit_box.width - 2)
     finally:
         _close_shadow_windows(bottom_shadow, right_shadow)
         for r in (edit_box, matches_win, bot_sep_win, help_win):
@@ -2655,7 +2660,7 @@ def _draw_jump_to_dialog(
     scroll,
 ):
 
-    edit_width = _width(edit_box) - 2
+    edit_width = edit_box.width - 2
 
     #
     # Update list of matches
@@ -2688,7 +2693,7 @@ def _draw_jump_to_dialog(
 
     if matches:
         # Draw items inside the box (offset by 1 row and 1 column for borders)
-        for i in range(scroll, min(scroll + _height(matches_win) - 2, len(matches))):
+        for i in range(scroll, min(scroll + matches_win.height - 2, len(matches))):
 
             node = matches[i]
 
@@ -2751,8 +2756,10 @@ def _draw_jump_to_dialog(
 
     _draw_frame(edit_box, "Jump to symbol/choice/menu/comment")
 
-    visible_s = s[hscroll : hscroll + edit_width]
-    edit_box.write(1, 1, visible_s, _style["jump-edit"])
+    # Let write() clip at the edit width instead of slicing out the visible
+    # window first. The compositor only emits the cells that changed, so
+    # typing at the end of the string redraws just the new character.
+    edit_box.write(1, 1, s[hscroll:], _style["jump-edit"], max_len=edit_width)
 
     _term.set_cursor(edit_box, 1, 1 + s_i - hscroll)
 
@@ -2786,8 +2793,6 @@ def _info_dialog(node, from_jump_to_dialog):
 
             _draw_info_dialog(win, node, lines, scroll)
 
-            _refresh_shadow_windows(bottom_shadow, right_shadow)
-
             _term.update()
 
             c = _term.read_key()
@@ -2915,10 +2920,9 @@ def _draw_info_dialog(win, node, lines, scroll):
     text_width = win_width - 3  # borders + 1 space margin
     max_scroll = _max_scroll_info(lines, win)
 
-    for i in range(text_height):
-        line_idx = scroll + i
-        if line_idx < len(lines):
-            win.write(1 + i, 2, lines[line_idx][:text_width], body_style)
+    write = win.write
+    for i, line in enumerate(lines[scroll : scroll + text_height], 1):
+        write(i, 2, line, body_style, max_len=text_width)
 
     # Scroll percentage on the separator line (matching mconf position)
     percentage = int((float(scroll) / max_scroll) * 100) if max_scroll > 0 else 100
@@ -2936,7 +2940,7 @@ def _draw_info_dialog(win, node, lines, scroll):
 def _max_scroll_info(lines, win):
     # Calculate max scroll for info dialog
     # Text area height = win_height - 4 (top border, separator, button, bottom border)
-    win_height = _height(win)
+    win_height = win.height
     text_area_height = win_height - 4
     return max(0, len(lines) - text_area_height)
 
@@ -2946,6 +2950,7 @@ def _info_str_mconf(node):
     # matching menu_get_ext_help() + get_symbol_str() from mconf.c.
 
     sc = node.item if isinstance(node.item, (Symbol, Choice)) else None
+    is_sym = isinstance(sc, Symbol)
 
     s = ""
 
@@ -2969,7 +2974,7 @@ def _info_str_mconf(node):
         if sc.name:
             s += f"Symbol: {sc.name} [={sc.str_value}]\n"
             s += f"Type  : {TYPE_TO_STR[sc.orig_type].lower()}\n"
-            if isinstance(sc, Symbol) and sc.orig_type in (INT, HEX):
+            if is_sym and sc.orig_type in (INT, HEX):
                 for low, high, cond in sc.orig_ranges:
                     if expr_value(cond):
                         s += f"Range : [{low.str_value}..{high.str_value}]\n"
@@ -2988,14 +2993,14 @@ def _info_str_mconf(node):
                 while m is not _kconf.top_node and len(submenu) < 8:
                     submenu.append(m)
                     m = m.parent
+                submenu.reverse()
                 s += "  Location:\n"
-                for j in range(len(submenu)):
-                    pm = submenu[len(submenu) - 1 - j]
-                    indent = 2 * j + 4
+                for j, pm in enumerate(submenu):
+                    pad = (2 * j + 4) * " "
                     prompt_text = (
                         pm.prompt[0] if pm.prompt else standard_sc_expr_str(pm.item)
                     )
-                    s += "{}-> {}".format(" " * indent, prompt_text)
+                    s += f"{pad}-> {prompt_text}"
                     if isinstance(pm.item, (Symbol, Choice)):
                         name = pm.item.name if pm.item.name else "<choice>"
                         s += f" ({name} [={pm.item.str_value}])"
@@ -3009,12 +3014,12 @@ def _info_str_mconf(node):
                     s += f"  Depends on: {_expr_str(n.dep)}\n"
 
         # Selects (symbols only)
-        if isinstance(sc, Symbol) and sc.selects:
+        if is_sym and sc.selects:
             sel_strs = [_expr_str(sel_sym) for sel_sym, cond in sc.orig_selects]
-            s += "Selects: {}\n".format(" && ".join(sel_strs))
+            s += f"Selects: {' && '.join(sel_strs)}\n"
 
         # Selected by
-        if isinstance(sc, Symbol) and sc.rev_dep is not _kconf.n:
+        if is_sym and sc.rev_dep is not _kconf.n:
             for val, label in (
                 (2, "Selected by [y]:"),
                 (1, "Selected by [m]:"),
@@ -3031,12 +3036,12 @@ def _info_str_mconf(node):
                             s += f"  - {parts[0].name}\n"
 
         # Implies (symbols only)
-        if isinstance(sc, Symbol) and sc.implies:
+        if is_sym and sc.implies:
             imp_strs = [_expr_str(imp_sym) for imp_sym, cond in sc.orig_implies]
-            s += "Implies: {}\n".format(" && ".join(imp_strs))
+            s += f"Implies: {' && '.join(imp_strs)}\n"
 
         # Implied by
-        if isinstance(sc, Symbol) and sc.weak_rev_dep is not _kconf.n:
+        if is_sym and sc.weak_rev_dep is not _kconf.n:
             for val, label in (
                 (2, "Implied by [y]:"),
                 (1, "Implied by [m]:"),
@@ -3121,9 +3126,8 @@ def _value_info(sym):
     # Returns a string showing 'sym's value
 
     # Only put quotes around the value for string symbols
-    s = "Value: {}\n".format(
-        f'"{sym.str_value}"' if sym.orig_type == STRING else sym.str_value
-    )
+    value = f'"{sym.str_value}"' if sym.orig_type == STRING else sym.str_value
+    s = f"Value: {value}\n"
 
     # Add origin information to explain where the value comes from
     origin = sym.origin
@@ -3131,10 +3135,10 @@ def _value_info(sym):
         kind, sources = origin
         if kind == "select":
             if sources:
-                s += "  (selected by: {})\n".format(", ".join(sources))
+                s += f"  (selected by: {', '.join(sources)})\n"
         elif kind == "imply":
             if sources:
-                s += "  (implied by: {})\n".format(", ".join(sources))
+                s += f"  (implied by: {', '.join(sources)})\n"
         elif kind == "default":
             s += "  (from default)\n"
         elif kind == "assign":
@@ -3236,9 +3240,10 @@ def _split_expr_info(expr, indent):
         split_op = OR
         op_str = "||"
 
+    pad = indent * " "
     s = ""
     for i, term in enumerate(split_expr(expr, split_op)):
-        s += "{}{} {}".format(indent * " ", "  " if i == 0 else op_str, _expr_str(term))
+        s += f"{pad}{'  ' if i == 0 else op_str} {_expr_str(term)}"
 
         # Don't bother showing the value hint if the expression is just a
         # single symbol. _expr_str() already shows its value.
@@ -3293,9 +3298,8 @@ def _kconfig_def_info(item):
 
     nodes = [item] if isinstance(item, MenuNode) else item.nodes
 
-    s = "Kconfig definition{}, with parent deps. propagated to 'depends on'\n".format(
-        "s" if len(nodes) > 1 else ""
-    )
+    plural = "s" if len(nodes) > 1 else ""
+    s = f"Kconfig definition{plural}, with parent deps. propagated to 'depends on'\n"
     s += (len(s) - 1) * "="
 
     for node in nodes:
@@ -3315,9 +3319,8 @@ def _include_path_info(node):
         # In the top-level Kconfig file
         return ""
 
-    return "Included via {}\n".format(
-        " -> ".join(f"{filename}:{linenr}" for filename, linenr in node.include_path)
-    )
+    path = " -> ".join(f"{filename}:{linenr}" for filename, linenr in node.include_path)
+    return f"Included via {path}\n"
 
 
 def _menu_path_info(node):
@@ -3353,12 +3356,17 @@ def _name_and_val_str(sc):
     # numbers. Things like 123 are actually symbol references, and only work as
     # expected due to undefined symbols getting their name as their value.
     # Showing the symbol value for those isn't helpful though.
-    if isinstance(sc, Symbol) and not sc.is_constant and not _is_num(sc.name):
-        if not sc.nodes:
-            # Undefined symbol reference
-            return f"{sc.name}(undefined/n)"
+    if isinstance(sc, Symbol) and not sc.is_constant:
+        is_num = _is_num_cache.get(sc.name)
+        if is_num is None:
+            is_num = _is_num_cache[sc.name] = _is_num(sc.name)
 
-        return f"{sc.name}(={sc.str_value})"
+        if not is_num:
+            if not sc.nodes:
+                # Undefined symbol reference
+                return f"{sc.name}(undefined/n)"
+
+            return f"{sc.name}(={sc.str_value})"
 
     # For other items, use the standard format
     return standard_sc_expr_str(sc)
@@ -3384,7 +3392,7 @@ def _max_scroll(lst, win):
     # returns the maximum number of steps 'win' can be scrolled down.
     # We stop scrolling when the bottom item is visible.
 
-    return max(0, len(lst) - _height(win))
+    return max(0, len(lst) - win.height)
 
 
 def _edit_text(c, s, i, hscroll, width):
@@ -3466,8 +3474,9 @@ def _edit_text(c, s, i, hscroll, width):
 def _load_save_info():
     # Returns an information string for load/save dialog boxes
 
-    return "(Relative to {})\n\nRefer to your home directory with ~".format(
-        os.path.join(os.getcwd(), "")
+    return (
+        f"(Relative to {os.path.join(os.getcwd(), '')})\n\n"
+        "Refer to your home directory with ~"
     )
 
 
@@ -3483,6 +3492,10 @@ def _error(text):
     _msg("Error", text)
 
 
+# Symbol types whose value can be forced by 'select' and 'imply'
+_FORCEABLE_TYPES = frozenset((BOOL, TRISTATE))
+
+
 def _get_force_info(sym):
     # Returns a string indicating what's forcing a symbol's value, or None
     # if the value is not being forced by select/imply.
@@ -3491,7 +3504,10 @@ def _get_force_info(sym):
     #   " [selected by FOO]"
     #   " [implied by BAR, BAZ]"
 
-    if sym.orig_type not in (BOOL, TRISTATE):
+    # Check the type first. 'origin' is a computed property that evaluates
+    # the symbol and formats the select/imply conditions, so it's the
+    # expensive test of the two.
+    if sym.orig_type not in _FORCEABLE_TYPES:
         return None
 
     origin = sym.origin
@@ -3511,9 +3527,9 @@ def _get_force_info(sym):
 
     # Show up to 2 symbols to keep line length reasonable
     if len(sym_names) <= 2:
-        return " [{} {}]".format(prefix, ", ".join(sym_names))
+        return f" [{prefix} {', '.join(sym_names)}]"
 
-    return " [{} {}, +{}]".format(prefix, ", ".join(sym_names[:2]), len(sym_names) - 2)
+    return f" [{prefix} {', '.join(sym_names[:2])}, +{len(sym_names) - 2}]"
 
 
 def _node_str(node):
@@ -3531,7 +3547,7 @@ def _node_str(node):
         parent = parent.parent
 
     # This approach gives nice alignment for empty string symbols ("()  Foo")
-    s = "{:{}}".format(_value_str(node), 3 + indent)
+    s = f"{_value_str(node):{3 + indent}}"
 
     if _should_show_name(node):
         if isinstance(node.item, Symbol):
@@ -3645,6 +3661,11 @@ def _is_y_mode_choice_sym(item):
     return isinstance(item, Symbol) and item.choice and item.visibility == 2
 
 
+# Characters that can appear in values accepted by int(s, 10) and int(s, 16)
+_INT_CHARS = frozenset("0123456789+-_")
+_HEX_CHARS = _INT_CHARS | frozenset("abcdefABCDEFxX")
+
+
 def _check_valid(sym, s):
     # Returns True if the string 's' is a well-formed value for 'sym'.
     # Otherwise, displays an error and returns False.
@@ -3652,11 +3673,24 @@ def _check_valid(sym, s):
     if sym.orig_type not in (INT, HEX):
         return True  # Anything goes for non-int/hex symbols
 
-    base = 10 if sym.orig_type == INT else 16
+    if sym.orig_type == INT:
+        base = 10
+        valid_chars = _INT_CHARS
+    else:
+        base = 16
+        valid_chars = _HEX_CHARS
+
+    malformed_msg = f"'{s}' is a malformed {TYPE_TO_STR[sym.orig_type]} value"
+
+    # Catch stray characters without going through int()'s ValueError
+    if not valid_chars.issuperset(s):
+        _error(malformed_msg)
+        return False
+
     try:
-        int(s, base)
+        val = int(s, base)
     except ValueError:
-        _error(f"'{s}' is a malformed {TYPE_TO_STR[sym.orig_type]} value")
+        _error(malformed_msg)
         return False
 
     for low_sym, high_sym, cond, _ in sym.ranges:
@@ -3664,7 +3698,7 @@ def _check_valid(sym, s):
             low_s = low_sym.str_value
             high_s = high_sym.str_value
 
-            if not int(low_s, base) <= int(s, base) <= int(high_s, base):
+            if not int(low_s, base) <= val <= int(high_s, base):
                 _error(f"{s} is outside the range {low_s}-{high_s}")
                 return False
 
@@ -3677,46 +3711,47 @@ def _range_info(sym):
     # Returns a string with information about the valid range for the symbol
     # 'sym', or None if 'sym' doesn't have a range
 
-    if sym.orig_type in (INT, HEX):
-        for low, high, cond, _ in sym.ranges:
-            if expr_value(cond):
-                return f"Range: {low.str_value}-{high.str_value}"
+    if not sym.ranges or sym.orig_type not in (INT, HEX):
+        return None
+
+    for low, high, cond, _ in sym.ranges:
+        if expr_value(cond):
+            return f"Range: {low.str_value}-{high.str_value}"
 
     return None
 
 
+# Maps symbol names to _is_num() results. The result only depends on the
+# name, and _name_and_val_str() asks for it on every expression redraw.
+_is_num_cache = {}
+
+
 def _is_num(name):
     # Heuristic to see if a symbol name looks like a number, for nicer output
     # when printing expressions. Things like 16 are actually symbol names, only
     # they get their name as their value when the symbol is undefined.
 
-    try:
-        int(name)
-    except ValueError:
-        if not name.startswith(("0x", "0X")):
-            return False
+    return _num_fullmatch(name) is not None
 
-        try:
-            int(name, 16)
-        except ValueError:
-            return False
 
-    return True
+# Matches the strings accepted by int(name) or, with a 0x/0X prefix, by
+# int(name, 16), restricted to characters that can appear in symbol names.
+# Avoids raising ValueError for every non-numeric name.
+_num_fullmatch = re.compile(
+    r"[-+]?[0-9]+(?:_[0-9]+)*|0[xX](?:_?[0-9a-fA-F])+", re.ASCII
+).fullmatch
 
 
 def _warn(*args):
-    # Temporarily exits terminal mode and prints a warning to stderr.
-    # The warning would get lost in terminal mode.
-    try:
+    # Temporarily exits terminal mode (if active) and prints a warning to
+    # stderr. The warning would get lost in terminal mode.
+    suspend = _term is not None and _term.active
+    if suspend:
         _term.suspend()
-    except Exception:
-        pass
     print("menuconfig warning: ", end="", file=sys.stderr)
     print(*args, file=sys.stderr)
-    try:
+    if suspend:
         _term.resume()
-    except Exception:
-        pass
 
 
 def _change_c_lc_ctype_to_utf8():
@@ -3728,21 +3763,23 @@ def _change_c_lc_ctype_to_utf8():
         # supported from some quick testing either. Play it safe.
         return
 
-    def try_set_locale(loc):
+    # Is LC_CTYPE set to the C locale? This is a single query in the common
+    # case. Don't try to skip it by looking at LANG/LC_ALL/LC_CTYPE instead:
+    # a UTF-8 locale named there that isn't installed still leaves LC_CTYPE
+    # at "C".
+    if locale.setlocale(locale.LC_CTYPE) != "C":
+        return
+
+    # This list was taken from the PEP 538 implementation in the CPython code,
+    # in Python/pylifecycle.c
+    for loc in "C.UTF-8", "C.utf8", "UTF-8":
         try:
             locale.setlocale(locale.LC_CTYPE, loc)
-            return True
         except locale.Error:
-            return False
-
-    # Is LC_CTYPE set to the C locale?
-    if locale.setlocale(locale.LC_CTYPE) == "C":
-        # This list was taken from the PEP 538 implementation in the CPython
-        # code, in Python/pylifecycle.c
-        for loc in "C.UTF-8", "C.utf8", "UTF-8":
-            if try_set_locale(loc):
-                # LC_CTYPE successfully changed
-                return
+            continue
+
+        # LC_CTYPE successfully changed
+        return
 
 
 if __name__ == "__main__":
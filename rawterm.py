@@ -35,6 +35,10 @@ _IS_WINDOWS = os.name == "nt"
 if not _IS_WINDOWS:
     import select
     import termios
+else:
+    import ctypes
+    import msvcrt
+    from ctypes import wintypes
 
 
 # ---------------------------------------------------------------------------
@@ -189,17 +193,43 @@ NAMED_COLORS = {
 
 
 class Style:
-    """Immutable style combining foreground, background, and attributes."""
+    """Immutable style combining foreground, background, and attributes.
 
-    __slots__ = ("fg", "bg", "bold", "standout", "underline", "_sgr_cache")
+    Instances are interned: constructing a Style equal to an existing one
+    returns the existing instance, so equal styles can be compared by
+    identity and share one precomputed SGR string.
+    """
 
-    def __init__(self, fg=None, bg=None, bold=False, standout=False, underline=False):
-        self.fg = fg if fg is not None else Color.DEFAULT
-        self.bg = bg if bg is not None else Color.DEFAULT
-        self.bold = bold
-        self.standout = standout
-        self.underline = underline
-        self._sgr_cache = None
+    __slots__ = ("fg", "bg", "bold", "standout", "underline", "_sgr_cache", "_bits")
+
+    def __new__(cls, fg=None, bg=None, bold=False, standout=False, underline=False):
+        if fg is None:
+            fg = Color.DEFAULT
+        if bg is None:
+            bg = Color.DEFAULT
+
+        key = (fg, bg, bold, standout, underline)
+        self = _style_pool.get(key)
+        if self is None:
+            self = object.__new__(cls)
+            self.fg = fg
+            self.bg = bg
+            self.bold = bold
+            self.standout = standout
+            self.underline = underline
+            # Reset, colors, then attributes, filled into one template
+            self._sgr_cache = "\x1b[0;{};{}{}{}{}m".format(
+                fg._sgr_fg(),
+                bg._sgr_bg(),
+                ";1" if bold else "",
+                ";4" if underline else "",
+                ";7" if standout else "",
+            )
+            # Style part of packed cells, see _CELL_STYLE_SHIFT
+            self._bits = len(_style_table) << _CELL_STYLE_SHIFT
+            _style_table.append(self)
+            _style_pool[key] = self
+        return self
 
     def __or__(self, other):
         """Combine two styles. 'other' overrides non-default fields."""
@@ -215,35 +245,10 @@ class Style:
 
     def sgr(self):
         """Return the SGR escape sequence string for this style."""
-        if self._sgr_cache is not None:
-            return self._sgr_cache
-
-        parts = ["0"]  # reset first
-        parts.append(self.fg._sgr_fg())
-        parts.append(self.bg._sgr_bg())
-        if self.bold:
-            parts.append("1")
-        if self.underline:
-            parts.append("4")
-        if self.standout:
-            parts.append("7")
-
-        self._sgr_cache = "\x1b[{}m".format(";".join(parts))
         return self._sgr_cache
 
-    def __eq__(self, other):
-        if not isinstance(other, Style):
-            return NotImplemented
-        return (
-            self.fg == other.fg
-            and self.bg == other.bg
-            and self.bold == other.bold
-            and self.standout == other.standout
-            and self.underline == other.underline
-        )
-
-    def __hash__(self):
-        return hash((self.fg, self.bg, self.bold, self.standout, self.underline))
+    # No __eq__() or __hash__(). Instances are interned, so the default
+    # identity-based versions are correct and run entirely in C.
 
     def __repr__(self):
         parts = []
@@ -260,6 +265,21 @@ class Style:
         return "Style({})".format(", ".join(parts))
 
 
+# Interned Style instances, keyed by their fields
+_style_pool = {}
+
+# Interned Style instances, indexed by the style ID stored in packed cells
+_style_table = []
+
+# Region and frame cells are packed into a single int: the code point in
+# the low bits and the style ID above it. Comparing ints is much cheaper
+# than comparing (char, style) tuples when diffing frames.
+_CELL_STYLE_SHIFT = 21
+_CELL_CHAR_MASK = (1 << _CELL_STYLE_SHIFT) - 1
+# Code point (outside of Unicode) marking the second cell of a wide
+# character
+_CELL_PLACEHOLDER = 0x110000
+
 # Default style (terminal defaults, no attributes)
 STYLE_DEFAULT = Style()
 
@@ -309,24 +329,36 @@ class Box:
 # ---------------------------------------------------------------------------
 
 
+# Widths of the ASCII characters: 0 for control characters, 1 otherwise
+_ASCII_WIDTHS = bytes(0 if o < 0x20 or o == 0x7F else 1 for o in range(128))
+
+# Widths of non-ASCII characters seen so far, filled in by _char_width()
+_char_width_cache = {}
+
+
 def _char_width(ch):
     """Return the display width of a character in terminal cells.
 
-    - ASCII printable (0x20-0x7E): 1 cell (fast path)
+    - ASCII printable (0x20-0x7E): 1 cell (table lookup)
     - East Asian Wide/Fullwidth: 2 cells
     - Combining marks, control chars: 0 cells
     - Everything else: 1 cell
+
+    Non-ASCII results are cached, since the same few characters (box
+    drawing, CJK labels) are measured over and over.
     """
     o = ord(ch)
+    if o < 0x80:
+        return _ASCII_WIDTHS[o]
 
-    # Fast path for ASCII
-    if 0x20 <= o <= 0x7E:
-        return 1
+    w = _char_width_cache.get(ch)
+    if w is None:
+        w = _char_width_cache[ch] = _unicode_width(ch)
+    return w
 
-    # Control characters
-    if o < 0x20 or o == 0x7F:
-        return 0
 
+def _unicode_width(ch):
+    """Return the display width of a non-ASCII character."""
     # Check east asian width
     eaw = unicodedata.east_asian_width(ch)
     if eaw in ("W", "F"):
@@ -342,11 +374,15 @@ def _char_width(ch):
 
 def _str_width(s):
     """Return the display width of a string in terminal cells."""
-    return sum(_char_width(ch) for ch in s)
+    # Printable ASCII is one cell per character. min() and max() scan the
+    # string in C, which is much cheaper than measuring each character.
+    if not s or (min(s) >= " " and max(s) < "\x7f"):
+        return len(s)
+    return sum(map(_char_width, s))
 
 
 # ---------------------------------------------------------------------------
-# Escape sequence trie for input parsing
+# Escape sequence DFA for input parsing
 # ---------------------------------------------------------------------------
 
 # Map escape sequences to Key constants. Multiple entries per key to
@@ -379,20 +415,28 @@ _ESCAPE_SEQUENCES = {
 }
 
 
-def _build_trie(sequences):
-    """Build a trie (nested dict) from escape sequence table."""
-    root = {}
+def _build_dfa(sequences):
+    """Build a flat DFA transition table from escape sequence table.
+
+    Maps (state, char) to (next_state, key). State 0 is entered on the
+    leading ESC. 'key' is None while more characters are expected, and
+    'next_state' is None when 'key' completes a sequence.
+    """
+    table = {}
+    n_states = 1
     for seq, key in sequences.items():
-        node = root
-        for ch in seq[:-1]:
-            if ch not in node:
-                node[ch] = {}
-            node = node[ch]
-        node[seq[-1]] = key
-    return root
+        state = 0
+        for ch in seq[1:-1]:
+            trans = table.get((state, ch))
+            if trans is None:
+                trans = table[state, ch] = (n_states, None)
+                n_states += 1
+            state = trans[0]
+        table[state, seq[-1]] = (None, key)
+    return table
 
 
-_ESCAPE_TRIE = _build_trie(_ESCAPE_SEQUENCES)
+_ESCAPE_DFA = _build_dfa(_ESCAPE_SEQUENCES)
 
 
 # ---------------------------------------------------------------------------
@@ -414,12 +458,15 @@ class Region:
         self._x = x
         self._dirty = True
         self._fill_style = STYLE_DEFAULT
-        # Cell buffer: list of rows, each row is list of (char, style) tuples
+        # Cell buffer: flat row-major list of packed cells (see
+        # _CELL_STYLE_SHIFT), indexed as y * width + x
         self._cells = self._make_cells(height, width)
+        # True if the buffer may contain wide-char placeholders, which the
+        # compositor must skip cell by cell
+        self._has_wide = False
 
     def _make_cells(self, height, width):
-        default = (" ", self._fill_style)
-        return [[default] * width for _ in range(height)]
+        return [self._fill_style._bits | 0x20] * (height * width)
 
     @property
     def height(self):
@@ -446,6 +493,7 @@ class Region:
                 pass
             if self._terminal._cursor_region is self:
                 self._terminal._cursor_region = None
+            self._terminal._dirty = True
             self._terminal = None
 
     def resize(self, height, width):
@@ -453,6 +501,7 @@ class Region:
         self._height = height
         self._width = width
         self._cells = self._make_cells(height, width)
+        self._has_wide = False
         self._dirty = True
 
     def move(self, y, x):
@@ -468,9 +517,9 @@ class Region:
     def fill(self, style):
         """Set background style for entire region and remember it for clear()."""
         self._fill_style = style
-        cell = (" ", style)
-        for row in self._cells:
-            row[:] = [cell] * len(row)
+        # One list multiplication, which runs in C
+        self._cells = self._make_cells(self._height, self._width)
+        self._has_wide = False
         self._dirty = True
 
     def write(self, y, x, text, style=None, max_len=None):
@@ -485,17 +534,22 @@ class Region:
             return 0
 
         text = text.expandtabs()
+        bits = style._bits
+        cells = self._cells
+        base = y * self._width
         col = x
         cells_written = 0
 
         for ch in text:
-            if max_len is not None and cells_written >= max_len:
-                break
-
-            w = _char_width(ch)
+            o = ord(ch)
+            w = _ASCII_WIDTHS[o] if o < 0x80 else _char_width(ch)
             if w == 0:
                 continue
 
+            if max_len is not None and cells_written + w > max_len:
+                # Would exceed max_len (possibly by half a wide char) -- stop
+                break
+
             if col < 0:
                 col += w
                 continue
@@ -504,12 +558,13 @@ class Region:
                 # Wide char would overflow -- stop
                 break
 
-            self._cells[y][col] = (ch, style)
+            cells[base + col] = bits | o
             cells_written += w
 
             # For wide (CJK) chars, fill the second cell with a placeholder
             if w == 2 and col + 1 < self._width:
-                self._cells[y][col + 1] = ("", style)
+                cells[base + col + 1] = bits | _CELL_PLACEHOLDER
+                self._has_wide = True
 
             col += w
 
@@ -527,21 +582,93 @@ class Region:
         if x + w > self._width:
             return
 
-        self._cells[y][x] = (char, style)
+        i = y * self._width + x
+        self._cells[i] = style._bits | ord(char)
         if w == 2 and x + 1 < self._width:
-            self._cells[y][x + 1] = ("", style)
+            self._cells[i + 1] = style._bits | _CELL_PLACEHOLDER
+            self._has_wide = True
 
         self._dirty = True
 
+    def cell(self, y, x):
+        """Return the (char, style) pair at (y, x).
+
+        char is "" for the second cell of a wide character.
+        """
+        c = self._cells[y * self._width + x]
+        o = c & _CELL_CHAR_MASK
+        style = _style_table[c >> _CELL_STYLE_SHIFT]
+        return ("" if o == _CELL_PLACEHOLDER else chr(o), style)
+
     def getyx(self):
         """Compatibility: return (y, x) position. Always (0, 0) for regions."""
         return (0, 0)
 
 
+# ---------------------------------------------------------------------------
+# Windows console input records
+# ---------------------------------------------------------------------------
+
+if _IS_WINDOWS:
+
+    class _KEY_EVENT_RECORD(ctypes.Structure):
+        _fields_ = [
+            ("bKeyDown", wintypes.BOOL),
+            ("wRepeatCount", wintypes.WORD),
+            ("wVirtualKeyCode", wintypes.WORD),
+            ("wVirtualScanCode", wintypes.WORD),
+            ("uChar", wintypes.WCHAR),
+            ("dwControlKeyState", wintypes.DWORD),
+        ]
+
+    class _INPUT_RECORD(ctypes.Structure):
+        class _Event(ctypes.Union):
+            _fields_ = [("KeyEvent", _KEY_EVENT_RECORD)]
+
+        _fields_ = [
+            ("EventType", wintypes.WORD),
+            ("Event", _Event),
+        ]
+
+    _KEY_EVENT = 0x0001
+    _WINDOW_BUFFER_SIZE_EVENT = 0x0004
+
+    # Number of records fetched per ReadConsoleInputW() call
+    _INPUT_BATCH = 32
+
+    # Keys returned for VK codes, indexed by VK code (0-255). None for
+    # keys that are returned as their character instead.
+    _VK_TABLE = [None] * 256
+    _VK_TABLE[8] = Key.BACKSPACE  # VK_BACK
+    _VK_TABLE[27] = "\x1b"  # VK_ESCAPE
+    _VK_TABLE[33] = Key.PAGE_UP
+    _VK_TABLE[34] = Key.PAGE_DOWN
+    _VK_TABLE[35] = Key.END
+    _VK_TABLE[36] = Key.HOME
+    _VK_TABLE[37] = Key.LEFT
+    _VK_TABLE[38] = Key.UP
+    _VK_TABLE[39] = Key.RIGHT
+    _VK_TABLE[40] = Key.DOWN
+    _VK_TABLE[46] = Key.DELETE
+
+
 # ---------------------------------------------------------------------------
 # Terminal
 # ---------------------------------------------------------------------------
 
+# Width of the spans that Terminal.update() compares with a single slice
+# comparison before diffing changed rows cell by cell
+_DIFF_SPAN = 16
+
+# Control sequences written outside of frame updates. They are stored
+# pre-encoded, and _write_raw() writes bytes as is.
+_ENTER_ALT_SCREEN = b"\x1b[?1049h"
+_LEAVE_ALT_SCREEN = b"\x1b[?1049l"
+_HIDE_CURSOR = b"\x1b[?25l"
+_SHOW_CURSOR = b"\x1b[?25h"
+_RESET_ATTRS = b"\x1b[0m"
+_CLEAR_SCREEN = b"\x1b[2J"
+
 
 class Terminal:
     """Manages terminal state, screen compositing, and input."""
@@ -560,13 +687,25 @@ class Terminal:
         self._cursor_visible = False
         self._cursor_very_visible = False
         self._suspended = False
+        self._closed = False
         self._resize_pending = False
         self._prev_frame = None  # Previous frame for diffing
+        # Frame before that, reused as the buffer for the next frame
+        self._spare_frame = None
+        # Cursor positioning (CUP) sequences for every cell, indexed
+        # [row][col]. Rebuilt by update() when the size changes.
+        self._cup = []
+        # Set when the screen changes in a way the regions' own dirty flags
+        # don't track: a region was closed or the cursor changed
+        self._dirty = True
 
-        # Escape sequence parser state (shared by Unix and Windows VT paths)
-        self._esc_buf = []
-        self._esc_node = None
+        # Escape sequence parser state (shared by Unix and Windows VT paths):
+        # DFA state while inside a sequence, None otherwise
+        self._esc_state = None
         self._pending_key = None
+        # Decoded input read on Unix but not yet fed to the parser, e.g.
+        # the keys after the first one when several arrive in one read
+        self._unread = ""
 
         # Query initial terminal size
         sz = shutil.get_terminal_size()
@@ -580,9 +719,9 @@ class Terminal:
             self._init_unix()
 
         # Enter alternate screen
-        self._write_raw("\x1b[?1049h")
+        self._write_raw(_ENTER_ALT_SCREEN)
         # Hide cursor by default
-        self._write_raw("\x1b[?25l")
+        self._write_raw(_HIDE_CURSOR)
         self._flush()
 
     @staticmethod
@@ -619,10 +758,38 @@ class Terminal:
 
     def _init_windows(self):
         """Set up Windows terminal: VT100 output, console input."""
-        import ctypes
-        from ctypes import wintypes
-
-        kernel32 = ctypes.windll.kernel32
+        # Private instance, so that the prototypes declared below don't
+        # affect other users of ctypes.windll.kernel32
+        kernel32 = ctypes.WinDLL("kernel32")
+
+        # Declare prototypes for the functions on the input path, so that
+        # ctypes doesn't have to infer argument conversions on every call
+        LPDWORD = ctypes.POINTER(wintypes.DWORD)
+        PINPUT_RECORD = ctypes.POINTER(_INPUT_RECORD)
+        for fn, argtypes, restype in (
+            (
+                kernel32.ReadConsoleInputW,
+                (wintypes.HANDLE, PINPUT_RECORD, wintypes.DWORD, LPDWORD),
+                wintypes.BOOL,
+            ),
+            (
+                kernel32.PeekConsoleInputW,
+                (wintypes.HANDLE, PINPUT_RECORD, wintypes.DWORD, LPDWORD),
+                wintypes.BOOL,
+            ),
+            (
+                kernel32.GetNumberOfConsoleInputEvents,
+                (wintypes.HANDLE, LPDWORD),
+                wintypes.BOOL,
+            ),
+            (
+                kernel32.WaitForSingleObject,
+                (wintypes.HANDLE, wintypes.DWORD),
+                wintypes.DWORD,
+            ),
+        ):
+            fn.argtypes = argtypes
+            fn.restype = restype
 
         # Get handles
         STD_INPUT_HANDLE = -10
@@ -661,7 +828,9 @@ class Terminal:
         new_in = (self._old_in_mode.value | ENABLE_VIRTUAL_TERMINAL_INPUT) & ~(
             0x0004 | 0x0002 | 0x0001
         )  # clear ECHO, LINE, PROCESSED
-        if kernel32.SetConsoleMode(self._stdin_handle, new_in):
+        # Also report window size changes as input records, so that the VT
+        # reader can block on the input handle and still notice resizes
+        if kernel32.SetConsoleMode(self._stdin_handle, new_in | 0x0008):
             self._win_vt_input = True
             self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
         else:
@@ -669,17 +838,25 @@ class Terminal:
             new_in = self._old_in_mode.value & ~(0x0004 | 0x0002 | 0x0001)
             new_in |= 0x0008  # ENABLE_WINDOW_INPUT
             kernel32.SetConsoleMode(self._stdin_handle, new_in)
+            # Batch buffer for _read_key_windows_console(), and the index
+            # of the next unprocessed record in it
+            self._win_records = (_INPUT_RECORD * _INPUT_BATCH)()
+            self._win_n_read = wintypes.DWORD()
+            self._win_rec_i = 0
 
         self._kernel32 = kernel32
 
     def close(self):
-        """Restore terminal state."""
+        """Restore terminal state. Does nothing if already closed."""
+        if self._closed:
+            return
+        self._closed = True
         # Show cursor
-        self._write_raw("\x1b[?25h")
+        self._write_raw(_SHOW_CURSOR)
         # Leave alternate screen
-        self._write_raw("\x1b[?1049l")
+        self._write_raw(_LEAVE_ALT_SCREEN)
         # Reset attributes
-        self._write_raw("\x1b[0m")
+        self._write_raw(_RESET_ATTRS)
         self._flush()
 
         if _IS_WINDOWS:
@@ -700,6 +877,11 @@ class Terminal:
     def height(self):
         return self._height
 
+    @property
+    def active(self):
+        """True while in terminal mode, i.e. not suspended or closed."""
+        return not (self._suspended or self._closed)
+
     def region(self, height, width, y=0, x=0):
         """Create and register a new Region."""
         r = Region(self, height, width, y, x)
@@ -709,24 +891,27 @@ class Terminal:
     def hide_cursor(self):
         self._cursor_visible = False
         self._cursor_very_visible = False
+        self._dirty = True
 
     def show_cursor(self, very_visible=False):
         self._cursor_visible = True
         self._cursor_very_visible = very_visible
+        self._dirty = True
 
     def set_cursor(self, region, y, x):
         """Position cursor in a region (for edit fields)."""
         self._cursor_region = region
         self._cursor_y = y
         self._cursor_x = x
+        self._dirty = True
 
     def suspend(self):
         """Temporarily exit for stderr output."""
         self._suspended = True
         # Leave alternate screen, show cursor, restore terminal
-        self._write_raw("\x1b[?25h")
-        self._write_raw("\x1b[?1049l")
-        self._write_raw("\x1b[0m")
+        self._write_raw(_SHOW_CURSOR)
+        self._write_raw(_LEAVE_ALT_SCREEN)
+        self._write_raw(_RESET_ATTRS)
         self._flush()
 
         if not _IS_WINDOWS:
@@ -739,9 +924,9 @@ class Terminal:
             self._set_cbreak()
 
         # Re-enter alternate screen
-        self._write_raw("\x1b[?1049h")
+        self._write_raw(_ENTER_ALT_SCREEN)
         if not self._cursor_visible:
-            self._write_raw("\x1b[?25l")
+            self._write_raw(_HIDE_CURSOR)
         self._flush()
 
         # Requery terminal size
@@ -769,24 +954,30 @@ class Terminal:
         """Check and handle pending resize."""
         if self._resize_pending:
             self._resize_pending = False
-            sz = shutil.get_terminal_size()
-            self._width = sz.columns
-            self._height = sz.lines
-            self._prev_frame = None  # force full repaint
-            # Clear screen so full repaint starts from clean slate.
-            # Terminal emulators may garble the alternate screen on resize.
-            self._write_raw("\x1b[2J")
-            self._flush()
+            self._apply_resize()
             return True
         return False
 
+    def _apply_resize(self):
+        """Pick up the new terminal size and prepare a full repaint."""
+        sz = shutil.get_terminal_size()
+        self._width = sz.columns
+        self._height = sz.lines
+        self._prev_frame = None  # force full repaint
+        # Clear screen so full repaint starts from clean slate.
+        # Terminal emulators may garble the alternate screen on resize.
+        self._write_raw(_CLEAR_SCREEN)
+        self._flush()
+
     # --- Output ---
 
     def _write_raw(self, s):
-        """Append raw string to output. Caller must call _flush()."""
+        """Append raw string or bytes to output. Caller must call _flush()."""
         # We write to stdout.buffer for binary safety
+        if isinstance(s, str):
+            s = s.encode("utf-8")
         try:
-            sys.stdout.buffer.write(s.encode("utf-8"))
+            sys.stdout.buffer.write(s)
         except OSError:
             pass
 
@@ -794,7 +985,9 @@ class Terminal:
         """Flush stdout.
 
         Terminal fds are always blocking, so the non-blocking dance is
-        purely defensive.  Each step (get_blocking, set_blocking, flush,
+        purely defensive, and only done if a plain flush fails with
+        BlockingIOError. That keeps the fcntl() calls off the path taken
+        on every update().  Each step (get_blocking, set_blocking, flush,
         restore) is isolated so that a failure in the probe never
         prevents the flush from running.
 
@@ -803,6 +996,16 @@ class Terminal:
         present, so we catch both and default to was_blocking=True
         (skip the set_blocking detour).
         """
+        try:
+            sys.stdout.buffer.flush()
+            return
+        except BlockingIOError:
+            # Someone made the fd non-blocking. The unwritten data stays
+            # buffered, so retry below with the fd made blocking.
+            pass
+        except OSError:
+            return
+
         was_blocking = True
         fd = None
         try:
@@ -837,63 +1040,164 @@ class Terminal:
         """Composite all regions and flush to terminal.
 
         Painter's algorithm: render regions back-to-front by registration
-        order. Frame diffing: only emit ANSI for changed cells.
+        order. Frame diffing: only emit ANSI for changed cells. Does
+        nothing if no region or cursor state changed since the last call.
         """
         if self._suspended:
             return
 
+        if (
+            not self._dirty
+            and self._prev_frame is not None
+            and not any(r._dirty for r in self._regions)
+        ):
+            return
+
         h = self._height
         w = self._width
 
-        # Build current frame: 2D array of (char, style)
-        default_cell = (" ", STYLE_DEFAULT)
-        frame = [[default_cell] * w for _ in range(h)]
-
-        # Painter's algorithm: paint regions in order (later = on top)
-        for region in self._regions:
+        # Occlusion culling: walk regions front-to-back and drop the ones
+        # that are off-screen or entirely covered by a region above them.
+        # Regions are opaque, except that wide-char placeholders let the
+        # cell below show through, so only regions without wide chars
+        # count as covering.
+        visible = []
+        covers = []
+        for region in reversed(self._regions):
             ry, rx = region._y, region._x
             # Clamp visible row/col ranges to screen bounds
             row_start = max(0, -ry)
             row_end = min(region._height, h - ry)
             col_start = max(0, -rx)
             col_end = min(region._width, w - rx)
+            if row_end <= row_start or col_end <= col_start:
+                # Entirely off-screen. Also guards the slice assignment
+                # below against negative indices.
+                continue
+
+            top = ry + row_start
+            bottom = ry + row_end
+            left = rx + col_start
+            right = rx + col_end
+            if any(
+                c_top <= top
+                and bottom <= c_bottom
+                and c_left <= left
+                and right <= c_right
+                for c_top, c_bottom, c_left, c_right in covers
+            ):
+                continue
+
+            visible.append((region, row_start, row_end, col_start, col_end))
+            if not region._has_wide:
+                covers.append((top, bottom, left, right))
+
+        # Build current frame: 2D array of packed cells. The frame from two
+        # updates ago is reused as the buffer. Rows that a full-width
+        # opaque region paints completely are overwritten anyway, and only
+        # the other rows are reset to the default cell.
+        default_cell = STYLE_DEFAULT._bits | 0x20
+        frame = self._spare_frame
+        if frame is None or len(frame) != h or (h and len(frame[0]) != w):
+            frame = [[default_cell] * w for _ in range(h)]
+        else:
+            painted = bytearray(h)
+            for top, bottom, left, right in covers:
+                if left == 0 and right == w:
+                    painted[top:bottom] = b"\1" * (bottom - top)
+            for row in range(h):
+                if not painted[row]:
+                    frame[row] = [default_cell] * w
+
+        # Painter's algorithm: paint regions in order (later = on top)
+        for region, row_start, row_end, col_start, col_end in reversed(visible):
+            ry, rx = region._y, region._x
+            cells = region._cells
+            rw = region._width
+
+            if not region._has_wide:
+                # Copy whole row spans with slice assignment, which runs in C
+                frame_start = rx + col_start
+                frame_end = rx + col_end
+                for row in range(row_start, row_end):
+                    base = row * rw
+                    frame[ry + row][frame_start:frame_end] = cells[
+                        base + col_start : base + col_end
+                    ]
+                continue
+
             for row in range(row_start, row_end):
                 frame_row = frame[ry + row]
-                region_row = region._cells[row]
+                base = row * rw
                 for col in range(col_start, col_end):
-                    cell = region_row[col]
-                    if cell[0] != "":  # skip wide-char placeholders
+                    cell = cells[base + col]
+                    # Skip wide-char placeholders
+                    if cell & _CELL_CHAR_MASK != _CELL_PLACEHOLDER:
                         frame_row[rx + col] = cell
 
-        # Diff against previous frame and emit changes
+        # Diff against previous frame and emit changes. The pieces are
+        # collected as str and encoded once by _write_raw(), which is faster
+        # than appending per-cell UTF-8 bytes to a bytearray.
         buf = []
         prev = self._prev_frame
 
-        last_style = None
+        cup = self._cup
+        if len(cup) != h or (cup and len(cup[0]) != w):
+            cup = self._cup = [
+                [f"\x1b[{row + 1};{col + 1}H" for col in range(w)] for row in range(h)
+            ]
+
+        last_style = -1
         last_row = -1
         last_col = -1
 
-        for row in range(h):
-            for col in range(w):
-                cell = frame[row][col]
-                if prev and prev[row][col] == cell:
-                    continue
-
-                ch, style = cell
+        # Changed rows are compared in spans first, so that only the spans
+        # that actually differ are walked cell by cell. A full repaint has
+        # nothing to compare against and walks each row as one span.
+        span = _DIFF_SPAN if prev else w
 
-                # Move cursor if not contiguous
-                if row != last_row or col != last_col:
-                    buf.append(f"\x1b[{row + 1};{col + 1}H")
+        for row in range(h):
+            frame_row = frame[row]
+            # Whole-row comparison runs in C and skips unchanged rows, which
+            # is most of them for typical redraws
+            if prev and prev[row] == frame_row:
+                continue
 
-                # Set style if changed
-                if style != last_style:
-                    buf.append(style.sgr())
-                    last_style = style
+            prev_row = prev[row] if prev else None
+            for start in range(0, w, span):
+                end = min(start + span, w)
+                if prev_row and prev_row[start:end] == frame_row[start:end]:
+                    continue
 
-                buf.append(ch or " ")
-                cw = _char_width(ch) if ch else 1
-                last_row = row
-                last_col = col + cw
+                for col in range(start, end):
+                    cell = frame_row[col]
+                    if prev_row and prev_row[col] == cell:
+                        continue
+
+                    # The compositor never copies wide-char placeholders
+                    # into the frame, so the code point is always a real
+                    # character
+                    o = cell & _CELL_CHAR_MASK
+                    style = cell >> _CELL_STYLE_SHIFT
+
+                    # Move cursor if not contiguous. Skipping forward within
+                    # the same row uses CUF, which is shorter than a full CUP.
+                    if row != last_row or col < last_col:
+                        buf.append(cup[row][col])
+                    elif col != last_col:
+                        buf.append(f"\x1b[{col - last_col}C")
+
+                    # Set style if changed. Styles are interned, so equal
+                    # styles have equal IDs.
+                    if style != last_style:
+                        buf.append(_style_table[style]._sgr_cache)
+                        last_style = style
+
+                    ch = chr(o)
+                    buf.append(ch)
+                    cw = _ASCII_WIDTHS[o] if o < 0x80 else _char_width(ch)
+                    last_row = row
+                    last_col = col + cw
 
         # Handle cursor visibility and position
         if self._cursor_visible and self._cursor_region:
@@ -912,7 +1216,11 @@ class Terminal:
             self._write_raw("".join(buf))
             self._flush()
 
+        self._spare_frame = prev
         self._prev_frame = frame
+        self._dirty = False
+        for r in self._regions:
+            r._dirty = False
 
     # --- Input ---
 
@@ -944,26 +1252,38 @@ class Terminal:
         fd = sys.stdin.fileno()
 
         while True:
-            try:
-                data = os.read(fd, 1024)
-            except OSError:
-                # EINTR from SIGWINCH
-                if self._check_resize():
-                    return Key.RESIZE
-                continue
+            chars = self._unread
+            self._unread = ""
 
-            if not data:
-                continue
+            if not chars:
+                try:
+                    data = os.read(fd, 1024)
+                except OSError:
+                    # EINTR from SIGWINCH
+                    if self._check_resize():
+                        return Key.RESIZE
+                    continue
+
+                if not data:
+                    continue
 
-            chars = self._decoder.decode(data)
+                if max(data) < 0x80 and not self._decoder.getstate()[0]:
+                    # Keys and escape sequences are ASCII, which decodes
+                    # directly. The incremental decoder is only needed for
+                    # non-ASCII input and split multibyte sequences.
+                    chars = data.decode("ascii")
+                else:
+                    chars = self._decoder.decode(data)
 
-            for ch in chars:
+            for i, ch in enumerate(chars):
                 result = self._feed_escape(ch)
                 if result is not None:
+                    # Keep the rest of the input for the next call
+                    self._unread = chars[i + 1 :]
                     return result
 
             # If we have a partial escape sequence, wait briefly for more
-            if self._esc_buf:
+            if self._esc_state is not None:
                 if self._poller.poll(25):
                     # More data available, keep reading
                     continue
@@ -982,26 +1302,20 @@ class Terminal:
         Returns a Key constant or str if a complete key was parsed,
         or None if more input is needed.
         """
-        if self._esc_node is not None:
+        if self._esc_state is not None:
             # We're in the middle of an escape sequence
-            if ch not in self._esc_node:
+            trans = _ESCAPE_DFA.get((self._esc_state, ch))
+            if trans is None:
                 # Dead end -- flush first (before _feed_char can
-                # overwrite _esc_buf when ch is ESC), then buffer ch
+                # restart the sequence when ch is ESC), then buffer ch
                 result = self._flush_escape()
                 self._pending_key = self._feed_char(ch)
                 return result
 
-            val = self._esc_node[ch]
-            if isinstance(val, dict):
-                # More characters expected
-                self._esc_buf.append(ch)
-                self._esc_node = val
-                return None
-
-            # Complete match
-            self._esc_buf = []
-            self._esc_node = None
-            return val
+            # Either more characters are expected (key is None), or the
+            # sequence is complete and the state goes back to None
+            self._esc_state, key = trans
+            return key
 
         return self._feed_char(ch)
 
@@ -1009,8 +1323,7 @@ class Terminal:
         """Process a non-escape-sequence character."""
         if ch == "\x1b":
             # Start of potential escape sequence
-            self._esc_buf = [ch]
-            self._esc_node = _ESCAPE_TRIE["\x1b"]
+            self._esc_state = 0
             return None
 
         if ch == "\x7f":
@@ -1026,12 +1339,11 @@ class Terminal:
 
     def _flush_escape(self):
         """Flush partial escape sequence buffer, returning first char."""
-        if not self._esc_buf:
+        if self._esc_state is None:
             return None
 
         # The first char is always ESC
-        self._esc_buf = []
-        self._esc_node = None
+        self._esc_state = None
         return "\x1b"
 
     def _read_key_windows(self):
@@ -1042,8 +1354,8 @@ class Terminal:
 
     def _read_key_windows_vt(self):
         """Windows VT100 input mode -- reuse Unix escape parser."""
-        import msvcrt
-        import time
+        WAIT_OBJECT_0 = 0
+        INFINITE = 0xFFFFFFFF
 
         while True:
             if msvcrt.kbhit():
@@ -1052,89 +1364,110 @@ class Terminal:
                 if result is not None:
                     return result
             else:
-                if self._esc_buf:
+                if self._esc_state is not None:
                     result = self._flush_escape()
                     if result is not None:
                         return result
                 if self._check_resize():
                     return Key.RESIZE
-                # Small sleep to avoid busy-wait
-                time.sleep(0.01)
-
-    def _read_key_windows_console(self):
-        """Windows console input via ReadConsoleInputW."""
-        import ctypes
-        from ctypes import wintypes
-
+                # Sleep until console input arrives. Resizes are reported
+                # as input records too (ENABLE_WINDOW_INPUT), so no timeout
+                # is needed to notice them.
+                if (
+                    self._kernel32.WaitForSingleObject(self._stdin_handle, INFINITE)
+                    == WAIT_OBJECT_0
+                ):
+                    self._discard_non_char_input()
+
+    def _discard_non_char_input(self):
+        """Drop queued console input records that msvcrt.getwch() skips.
+
+        Key releases and other non-character events keep the input handle
+        signaled without making msvcrt.kbhit() true, so waiting on the
+        handle would return immediately forever. They are removed unless a
+        character arrived in the meantime, in which case getwch() will
+        consume them along with it.
+
+        Window size events among them mark a resize as pending, since
+        getwch() would drop them silently.
+        """
         kernel32 = self._kernel32
+        handle = self._stdin_handle
 
-        # VK code to Key constant mapping
-        VK_MAP = {
-            33: Key.PAGE_UP,
-            34: Key.PAGE_DOWN,
-            35: Key.END,
-            36: Key.HOME,
-            37: Key.LEFT,
-            38: Key.UP,
-            39: Key.RIGHT,
-            40: Key.DOWN,
-            46: Key.DELETE,
-        }
-
-        class KEY_EVENT_RECORD(ctypes.Structure):
-            _fields_ = [
-                ("bKeyDown", wintypes.BOOL),
-                ("wRepeatCount", wintypes.WORD),
-                ("wVirtualKeyCode", wintypes.WORD),
-                ("wVirtualScanCode", wintypes.WORD),
-                ("uChar", wintypes.WCHAR),
-                ("dwControlKeyState", wintypes.DWORD),
-            ]
-
-        class INPUT_RECORD(ctypes.Structure):
-            class _Event(ctypes.Union):
-                _fields_ = [("KeyEvent", KEY_EVENT_RECORD)]
+        n = wintypes.DWORD()
+        if not kernel32.GetNumberOfConsoleInputEvents(handle, ctypes.byref(n)):
+            return
+        if not n.value:
+            return
 
-            _fields_ = [
-                ("EventType", wintypes.WORD),
-                ("Event", _Event),
-            ]
+        records = (_INPUT_RECORD * n.value)()
+        kernel32.PeekConsoleInputW(handle, records, n.value, ctypes.byref(n))
+        has_char = False
+        for ir in records[: n.value]:
+            if ir.EventType == _KEY_EVENT:
+                ke = ir.Event.KeyEvent
+                if ke.bKeyDown and ke.uChar and ke.uChar != "\0":
+                    has_char = True
+            elif ir.EventType == _WINDOW_BUFFER_SIZE_EVENT:
+                self._resize_pending = True
+        if has_char:
+            return
 
-        KEY_EVENT = 0x0001
-        WINDOW_BUFFER_SIZE_EVENT = 0x0004
+        # Records that arrive after the peek are queued behind these, so
+        # reading exactly this many removes only the ones inspected above
+        kernel32.ReadConsoleInputW(handle, records, n.value, ctypes.byref(n))
 
-        ir = INPUT_RECORD()
-        n_read = wintypes.DWORD()
+    def _read_key_windows_console(self):
+        """Windows console input via ReadConsoleInputW."""
+        records = self._win_records
+        n_read = self._win_n_read
 
         while True:
-            kernel32.ReadConsoleInputW(
-                self._stdin_handle, ctypes.byref(ir), 1, ctypes.byref(n_read)
-            )
-
-            if ir.EventType == KEY_EVENT:
-                ke = ir.Event.KeyEvent
-                if not ke.bKeyDown:
-                    continue
-
-                vk = ke.wVirtualKeyCode
-                ch = ke.uChar
-
-                if vk in VK_MAP:
-                    return VK_MAP[vk]
+            if self._win_rec_i >= n_read.value:
+                # Blocks until at least one record is available, then
+                # returns as many queued records as fit. Records not
+                # consumed below are kept for the next call.
+                n_read.value = 0
+                self._kernel32.ReadConsoleInputW(
+                    self._stdin_handle,
+                    records,
+                    _INPUT_BATCH,
+                    ctypes.byref(n_read),
+                )
+                self._win_rec_i = 0
+                continue
 
-                if vk == 8:  # VK_BACK
-                    return Key.BACKSPACE
+            ir = records[self._win_rec_i]
+            self._win_rec_i += 1
+
+            et = ir.EventType
+            if et != _KEY_EVENT:
+                if et == _WINDOW_BUFFER_SIZE_EVENT:
+                    # Dragging the window edge queues a burst of these. Only
+                    # query the new size and report the resize at the last
+                    # one in the batch, so that the menu is redrawn once.
+                    i = self._win_rec_i
+                    if (
+                        i < n_read.value
+                        and records[i].EventType == _WINDOW_BUFFER_SIZE_EVENT
+                    ):
+                        continue
+                    self._apply_resize()
+                    return Key.RESIZE
+                continue
 
-                if vk == 27:  # VK_ESCAPE
-                    return "\x1b"
+            ke = ir.Event.KeyEvent
+            if not ke.bKeyDown:
+                continue
 
-                if ch and ch != "\0":
-                    return self._feed_char(ch)
+            # VK codes are below 256
+            key = _VK_TABLE[ke.wVirtualKeyCode & 0xFF]
+            if key is not None:
+                return key
 
-            elif ir.EventType == WINDOW_BUFFER_SIZE_EVENT:
-                self._resize_pending = True
-                if self._check_resize():
-                    return Key.RESIZE
+            ch = ke.uChar
+            if ch and ch != "\0":
+                return self._feed_char(ch)
 
 
 # ---------------------------------------------------------------------------
@@ -1151,11 +1484,12 @@ def run(fn):
     term = None
     try:
         term = Terminal()
-        # Register atexit as safety net
-        atexit.register(lambda: term.close() if term else None)
+        # Register atexit as safety net. close() is idempotent.
+        atexit.register(term.close)
         return fn(term)
     except KeyboardInterrupt:
         pass
     finally:
         if term:
             term.close()
+            atexit.unregister(term.close)
@@ -61,18 +61,19 @@ def main():
     kconf = kconfiglib.Kconfig(args.kconfig, suppress_traceback=True)
     print(kconf.load_config())
 
+    syms = kconf.syms
+
     for arg in args.assignments:
-        if "=" not in arg:
+        name, sep, value = arg.partition("=")
+        if not sep:
             sys.exit(f"error: no '=' in assignment: '{arg}'")
-        name, value = arg.split("=", 1)
 
-        if name not in kconf.syms:
+        sym = syms.get(name)
+        if sym is None:
             if not args.check_exists:
                 continue
             sys.exit(f"error: no symbol '{name}' in configuration")
 
-        sym = kconf.syms[name]
-
         if not sym.set_value(value):
             sys.exit(
                 f"error: '{value}' is an invalid value for the {kconfiglib.TYPE_TO_STR[sym.orig_type]} symbol {name}"
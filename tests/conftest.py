@@ -3,14 +3,16 @@
 #
 # Shared fixtures and assertion helpers for the Kconfiglib pytest suite.
 
-import glob
 import os
 import sys
 
 import pytest
 
+_TESTS_DIR = os.path.dirname(__file__)
+_PROJECT_ROOT = os.path.join(_TESTS_DIR, "..")
+
 # Ensure kconfiglib is importable from the project root
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, _PROJECT_ROOT)
 
 from kconfiglib import TRI_TO_STR  # noqa: E402
 
@@ -31,26 +33,43 @@ def _clean_env(monkeypatch):
 
 @pytest.fixture(autouse=True)
 def _cleanup_config_files():
-    """Remove config_test* files after each test."""
+    """Remove config_test* files from tests/ after each test."""
+    yield
+    _remove_config_test_files(_TESTS_DIR)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _cleanup_root_config_files():
+    """Remove stray config_test* files from the project root.
+
+    Tests write their config_test* files to tests/, so the project root is
+    only swept once, at the end of the session.
+    """
     yield
-    tests_dir = os.path.join(os.path.dirname(__file__))
-    for f in glob.glob(os.path.join(tests_dir, "config_test*")):
-        os.remove(f)
-    # Also clean from project root (some tests write there)
-    project_root = os.path.join(os.path.dirname(__file__), "..")
-    for f in glob.glob(os.path.join(project_root, "config_test*")):
-        os.remove(f)
+    _remove_config_test_files(_PROJECT_ROOT)
+
+
+def _remove_config_test_files(d):
+    # A prefix check on the directory entries avoids glob's pattern
+    # translation
+    with os.scandir(d) as it:
+        for entry in it:
+            if entry.name.startswith("config_test"):
+                os.remove(entry.path)
 
 
 # ---------------------------------------------------------------------------
 # Assertion helpers
 #
 # These take an explicit Kconfig instance `c` rather than closing over one.
+# __tracebackhide__ drops their frames from pytest failure reports, so that
+# failures point at the calling test.
 # ---------------------------------------------------------------------------
 
 
 def verify_value(c, sym_name, val):
     """Verify that a symbol has a particular value."""
+    __tracebackhide__ = True
     if isinstance(val, int):
         val = TRI_TO_STR[val]
 
@@ -60,6 +79,7 @@ def verify_value(c, sym_name, val):
 
 def assign_and_verify_value(c, sym_name, val, new_val):
     """Assign val to a symbol and verify its value becomes new_val."""
+    __tracebackhide__ = True
     if isinstance(new_val, int):
         new_val = TRI_TO_STR[new_val]
 
@@ -71,11 +91,13 @@ def assign_and_verify_value(c, sym_name, val, new_val):
 def assign_and_verify(c, sym_name, user_val):
     """Like assign_and_verify_value(), with the expected value being the
     value just set."""
+    __tracebackhide__ = True
     assign_and_verify_value(c, sym_name, user_val, user_val)
 
 
 def assign_and_verify_user_value(c, sym_name, val, user_val, valid):
     """Assign a user value and verify the new user value and validity."""
+    __tracebackhide__ = True
     sym = c.syms[sym_name]
     assert sym.set_value(val) == valid, f"{sym_name} validity mismatch for '{val}'"
     assert sym.user_value == user_val, f"{sym_name} user_value mismatch"
@@ -83,4 +105,5 @@ def assign_and_verify_user_value(c, sym_name, val, user_val, valid):
 
 def verify_str(item, expected):
     """Verify str(item) matches expected (strip leading/trailing newline)."""
+    __tracebackhide__ = True
     assert str(item) == expected[1:-1]
@@ -5,17 +5,18 @@
 # header strings, symbol order in generated files, config_string,
 # and missing_syms.
 
-import os
-import tempfile
+from pathlib import Path
 
 from kconfiglib import Kconfig
 from conftest import verify_value
 
 
 def verify_file_contents(fname, expected):
-    with open(fname) as f:
-        actual = f.read()
-    assert actual == expected, f"{fname} contains '{actual}'. Expected '{expected}'."
+    # The expected contents are ASCII, so compare raw bytes and skip
+    # decoding the file
+    actual = Path(fname).read_bytes()
+    expected = expected.encode()
+    assert actual == expected, f"{fname} contains {actual!r}. Expected {expected!r}."
 
 
 # -- .config escape roundtrip --------------------------------------------------
@@ -222,7 +223,7 @@ def test_kconfig_fetching():
 # -- Symbol.config_string ----------------------------------------------------
 
 
-def test_config_string():
+def test_config_string_bool():
     c = Kconfig("tests/Kassignable", warn=False)
     c.modules.set_value(2)
 
@@ -241,60 +242,60 @@ def test_config_string():
     # Symbol with no visibility -> empty string (_write_to_conf false)
     assert c.syms["N_VIS_BOOL"].config_string == ""
 
+
+def test_config_string_string():
+    c = Kconfig("tests/Kescape")
+
     # String symbol: "CONFIG_...=\"value\""
-    c2 = Kconfig("tests/Kescape")
-    c2.syms["STRING"].set_value("hello world")
-    assert c2.syms["STRING"].config_string == 'CONFIG_STRING="hello world"\n'
+    c.syms["STRING"].set_value("hello world")
+    assert c.syms["STRING"].config_string == 'CONFIG_STRING="hello world"\n'
 
     # String with characters needing escaping
-    c2.syms["STRING"].set_value('a"b\\c')
-    assert c2.syms["STRING"].config_string == 'CONFIG_STRING="a\\"b\\\\c"\n'
+    c.syms["STRING"].set_value('a"b\\c')
+    assert c.syms["STRING"].config_string == 'CONFIG_STRING="a\\"b\\\\c"\n'
+
+
+def test_config_string_int_hex():
+    c = Kconfig("tests/Krange", warn=False)
 
     # Int symbol: "CONFIG_...=value"
-    c3 = Kconfig("tests/Krange", warn=False)
-    c3.syms["INT_RANGE_10_20"].set_value("15")
-    assert c3.syms["INT_RANGE_10_20"].config_string == "CONFIG_INT_RANGE_10_20=15\n"
+    c.syms["INT_RANGE_10_20"].set_value("15")
+    assert c.syms["INT_RANGE_10_20"].config_string == "CONFIG_INT_RANGE_10_20=15\n"
 
     # Hex symbol: "CONFIG_...=value"
-    c3.syms["HEX_RANGE_10_20"].set_value("0x15")
-    assert c3.syms["HEX_RANGE_10_20"].config_string == "CONFIG_HEX_RANGE_10_20=0x15\n"
+    c.syms["HEX_RANGE_10_20"].set_value("0x15")
+    assert c.syms["HEX_RANGE_10_20"].config_string == "CONFIG_HEX_RANGE_10_20=0x15\n"
 
 
 # -- Kconfig.missing_syms ---------------------------------------------------
 
 
-def test_missing_syms():
+def test_missing_syms(tmp_path):
     c = Kconfig("tests/Kappend", warn=False)
 
     # Initially empty
     assert c.missing_syms == []
 
     # Write configs with unknown symbols
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".config", delete=False) as f:
-        f.write("CONFIG_UNKNOWN_A=y\n")
-        f.write("CONFIG_UNKNOWN_B=42\n")
-        tmppath = f.name
-
-    with tempfile.NamedTemporaryFile(mode="w", suffix=".config", delete=False) as f:
-        f.write("CONFIG_UNKNOWN_C=m\n")
-        tmppath2 = f.name
-
-    try:
-        c.load_config(tmppath)
-        assert ("UNKNOWN_A", "y") in c.missing_syms
-        assert ("UNKNOWN_B", "42") in c.missing_syms
-        assert len(c.missing_syms) == 2
-
-        # replace=True (default) clears missing_syms before loading
-        c.load_config(tmppath2)
-        assert c.missing_syms == [("UNKNOWN_C", "m")]
-
-        # replace=False appends to missing_syms
-        c.load_config(tmppath, replace=False)
-        assert ("UNKNOWN_C", "m") in c.missing_syms
-        assert ("UNKNOWN_A", "y") in c.missing_syms
-        assert ("UNKNOWN_B", "42") in c.missing_syms
-        assert len(c.missing_syms) == 3
-    finally:
-        os.unlink(tmppath)
-        os.unlink(tmppath2)
+    path = tmp_path / "a.config"
+    path.write_text("CONFIG_UNKNOWN_A=y\nCONFIG_UNKNOWN_B=42\n")
+
+    path2 = tmp_path / "b.config"
+    path2.write_text("CONFIG_UNKNOWN_C=m\n")
+
+    c.load_config(str(path))
+    assert set(c.missing_syms) == {("UNKNOWN_A", "y"), ("UNKNOWN_B", "42")}
+    assert len(c.missing_syms) == 2
+
+    # replace=True (default) clears missing_syms before loading
+    c.load_config(str(path2))
+    assert c.missing_syms == [("UNKNOWN_C", "m")]
+
+    # replace=False appends to missing_syms
+    c.load_config(str(path), replace=False)
+    assert set(c.missing_syms) == {
+        ("UNKNOWN_C", "m"),
+        ("UNKNOWN_A", "y"),
+        ("UNKNOWN_B", "42"),
+    }
+    assert len(c.missing_syms) == 3
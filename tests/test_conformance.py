@@ -15,6 +15,7 @@
 # The entire module is skipped when scripts/kconfig/conf does not exist.
 
 import difflib
+import functools
 import os
 import re
 import shlex
@@ -70,41 +71,86 @@ log = os.environ.get("KCONFIGLIB_LOG", "") == "1"
 # ---------------------------------------------------------------------------
 
 
-@pytest.fixture(autouse=True, scope="module")
+@pytest.fixture(autouse=True, scope="session")
 def kernel_env():
     """Set up kernel build environment variables.
 
     These are referenced inside the kernel Kconfig files and must be present
     before any Kconfig object is instantiated.
+
+    KERNELVERSION and CC_VERSION_TEXT are only computed (by running make and
+    $CC) if they aren't already set in the environment pytest was started
+    from, e.g. when it is run from the kernel build, which exports both.
+    Inherited values are used as-is, without checking them against the tree
+    or the compiler.  Unset them if they might be stale, e.g. after
+    switching kernel trees or compilers in the same shell.
     """
     os.environ["srctree"] = "."
     os.environ.setdefault("CC", "gcc")
     os.environ.setdefault("LD", "ld")
     _make = os.environ.get("MAKE", "make")
     _cc = os.environ["CC"]
-    os.environ["KERNELVERSION"] = (
-        subprocess.check_output(f"{_make} kernelversion", shell=True)
-        .decode("utf-8")
-        .rstrip()
-    )
-    os.environ["CC_VERSION_TEXT"] = (
-        subprocess.check_output(f"{_cc} --version | head -n1", shell=True)
-        .decode("utf-8")
-        .rstrip()
-    )
+    if "KERNELVERSION" not in os.environ:
+        os.environ["KERNELVERSION"] = (
+            subprocess.check_output(shlex.split(_make) + ["kernelversion"])
+            .decode("utf-8")
+            .rstrip()
+        )
+    if "CC_VERSION_TEXT" not in os.environ:
+        # First line only, like 'head -n1'
+        os.environ["CC_VERSION_TEXT"] = (
+            subprocess.check_output(shlex.split(_cc) + ["--version"])
+            .decode("utf-8")
+            .split("\n", 1)[0]
+            .rstrip()
+        )
     yield
 
 
+@pytest.fixture(scope="session")
+def arch_kconf(arch, srcarch):
+    """Return the parsed Kconfig tree for an architecture.
+
+    Parsing a kernel tree takes seconds, so each (arch, srcarch) pair is
+    parsed once and the Kconfig instance is shared by test_defconfig,
+    test_min_config, test_sanity and test_sanity_io.  Those tests replace
+    all user values (load_config() or unset_values()) before relying on
+    them.  Skips the calling test if the tree fails to parse.
+
+    The tests parametrize 'arch' and 'srcarch' with scope="session", which
+    makes pytest run all tests for one architecture together and tear this
+    fixture down before parsing the next one.  Only one tree is kept in
+    memory at a time.
+    """
+    os.environ["ARCH"] = arch
+    os.environ["SRCARCH"] = srcarch
+
+    try:
+        kconf = Kconfig()
+    except KconfigError:
+        pytest.skip(f"Kconfig parsing failed for {arch}")
+
+    # Dependency loop detection leaves _visited at 2 for every defined
+    # symbol. Writing configuration files reuses _visited, so this can only
+    # be checked right after parsing.
+    for sym in kconf.defined_syms:
+        assert sym._visited == 2, (
+            f"{sym.name} has broken dependency loop detection "
+            f"(_visited = {sym._visited})"
+        )
+
+    return kconf
+
+
 # ---------------------------------------------------------------------------
 # Helper functions
 # ---------------------------------------------------------------------------
 
 
-def shell(cmd):
-    """Run a shell command, suppressing stdout and stderr."""
-    subprocess.call(
-        cmd, shell=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
-    )
+def shell(args):
+    """Run a command given as an argument list, without going through a
+    shell, suppressing stdout and stderr."""
+    subprocess.call(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
 
 
 def all_arch_srcarch():
@@ -159,7 +205,14 @@ def _collect_all_arch_pairs():
         return []
 
 
-_ALL_ARCH_PAIRS = _collect_all_arch_pairs()
+# x86_64 first, then the rest of the representative set, so that each
+# selection below is a prefix of this list.  pytest groups session-scoped
+# parameters by their position in the list, and arch_kconf is only reused
+# between tests if a pair sits at the same position in every list.
+_ALL_ARCH_PAIRS = sorted(
+    _collect_all_arch_pairs(),
+    key=lambda pair: (pair[0] != "x86_64", pair[0] not in _REPRESENTATIVE_ARCHS),
+)
 
 if obsessive:
     _DEFAULT_PAIRS = _ALL_ARCH_PAIRS
@@ -173,6 +226,10 @@ elif min_config_full:
 else:
     _MIN_CONFIG_PAIRS = [(a, s) for a, s in _ALL_ARCH_PAIRS if a == "x86_64"]
 
+# test_sanity_io always uses the representative set.  Writing the output
+# files exercises the same code for every architecture.
+_SANITY_IO_PAIRS = [(a, s) for a, s in _ALL_ARCH_PAIRS if a in _REPRESENTATIVE_ARCHS]
+
 
 def run_conf_and_compare(script, conf_flag, arch):
     """Run a Kconfiglib script and the C conf tool, then compare .config files.
@@ -187,13 +244,13 @@ def run_conf_and_compare(script, conf_flag, arch):
     If either tool fails to produce a .config, the comparison is skipped
     for this architecture (with a printed note).
     """
-    shell(f"{shlex.quote(sys.executable)} {shlex.quote(script)} Kconfig")
+    shell([sys.executable, script, "Kconfig"])
     if not os.path.exists(".config"):
         print(f"  {arch}: Kconfiglib script failed to produce .config, skipping")
         return
-    shell("mv .config ._config")
+    os.replace(".config", "._config")
 
-    shell(f"scripts/kconfig/conf --{conf_flag} Kconfig")
+    shell(["scripts/kconfig/conf", f"--{conf_flag}", "Kconfig"])
     if not os.path.exists(".config"):
         print(f"  {arch}: C conf tool failed to produce .config, skipping")
         return
@@ -201,23 +258,28 @@ def run_conf_and_compare(script, conf_flag, arch):
     compare_configs(arch)
 
 
+@functools.lru_cache(maxsize=None)
 def defconfig_files(srcarch):
-    """Yield defconfig file paths for a particular srcarch subdirectory
-    (arch/<srcarch>/).
+    """Return a tuple of defconfig file paths for a particular srcarch
+    subdirectory (arch/<srcarch>/).
+
+    Cached, since the same directories are walked for test_defconfig and
+    test_min_config, and for every architecture in obsessive mode.
     """
     srcarch_dir = os.path.join("arch", srcarch)
+    files = []
 
     root_defconfig = os.path.join(srcarch_dir, "defconfig")
     if os.path.exists(root_defconfig):
-        yield root_defconfig
+        files.append(root_defconfig)
 
     defconfigs_dir = os.path.join(srcarch_dir, "configs")
-    if not os.path.isdir(defconfigs_dir):
-        return
+    if os.path.isdir(defconfigs_dir):
+        for dirpath, _, filenames in os.walk(defconfigs_dir):
+            for filename in filenames:
+                files.append(os.path.join(dirpath, filename))
 
-    for dirpath, _, filenames in os.walk(defconfigs_dir):
-        for filename in filenames:
-            yield os.path.join(dirpath, filename)
+    return tuple(files)
 
 
 def collect_defconfigs(srcarch, use_obsessive):
@@ -246,6 +308,11 @@ def compare_configs(arch):
     assert equal_configs(), f"Mismatched .config for arch {arch}"
 
 
+# Matches a "# CONFIG_... is not set" line, which is config data rather than
+# part of the header
+_IS_NOT_SET_RE = re.compile(r"# CONFIG_\w+ is not set")
+
+
 def equal_configs():
     """Return True if .config and ._config are equivalent (ignoring the
     header comment generated by the C conf tool).
@@ -254,33 +321,40 @@ def equal_configs():
     """
     try:
         with open(".config") as f:
-            their = f.readlines()
+            their = f.read()
     except FileNotFoundError:
         print(".config not found (C conf tool may have failed)")
         return False
 
     # Strip the header generated by 'conf'.  Stop at the first non-comment
     # line, or at a "# CONFIG_... is not set" comment (which is config data).
-    for i, line in enumerate(their):
-        if not line.startswith("#") or re.match(r"# CONFIG_(\w+) is not set", line):
+    start = 0
+    while their.startswith("#", start):
+        if _IS_NOT_SET_RE.match(their, start):
             break
-    else:
-        i = len(their)
-    their = their[i:]
+        start = their.find("\n", start) + 1 or len(their)
+    their = their[start:]
 
     try:
         with open("._config") as f:
-            our = f.readlines()
+            our = f.read()
     except FileNotFoundError:
         print("._config not found (Kconfiglib script may have failed)")
         return False
 
+    # Compare the contents as whole strings, and only split them into lines
+    # for the diff on mismatch
     if their == our:
         return True
 
     print("Mismatched .config's! Unified diff:")
     sys.stdout.writelines(
-        difflib.unified_diff(their, our, fromfile="their", tofile="our")
+        difflib.unified_diff(
+            their.splitlines(True),
+            our.splitlines(True),
+            fromfile="their",
+            tofile="our",
+        )
     )
     return False
 
@@ -313,42 +387,48 @@ def _exercise_sym_api(kconf, sym):
 # in pytest output.
 
 _ALLCONFIG_CASES = [
-    ("Kconfiglib/allnoconfig.py", "allnoconfig"),
-    ("Kconfiglib/examples/allnoconfig_walk.py", "allnoconfig"),
-    ("Kconfiglib/allmodconfig.py", "allmodconfig"),
-    ("Kconfiglib/allyesconfig.py", "allyesconfig"),
-    ("Kconfiglib/alldefconfig.py", "alldefconfig"),
+    pytest.param("Kconfiglib/allnoconfig.py", "allnoconfig", id="allnoconfig"),
+    pytest.param(
+        "Kconfiglib/examples/allnoconfig_walk.py",
+        "allnoconfig",
+        id="allnoconfig_walk",
+    ),
+    pytest.param("Kconfiglib/allmodconfig.py", "allmodconfig", id="allmodconfig"),
+    pytest.param("Kconfiglib/allyesconfig.py", "allyesconfig", id="allyesconfig"),
+    pytest.param("Kconfiglib/alldefconfig.py", "alldefconfig", id="alldefconfig"),
 ]
 
 
+@pytest.mark.parametrize(
+    "arch,srcarch",
+    _DEFAULT_PAIRS,
+    ids=[a for a, _ in _DEFAULT_PAIRS],
+)
 @pytest.mark.parametrize(
     "script,conf_flag",
     _ALLCONFIG_CASES,
-    ids=[
-        c[1] if i == 0 or c[1] != _ALLCONFIG_CASES[i - 1][1] else f"{c[1]}_walk"
-        for i, c in enumerate(_ALLCONFIG_CASES)
-    ],
 )
-def test_allconfig(script, conf_flag):
+def test_allconfig(script, conf_flag, arch, srcarch):
     """Verify that a Kconfiglib *config script generates the same .config
-    as the corresponding 'make <conf_flag>', for each architecture.
+    as the corresponding 'make <conf_flag>', for the given architecture.
 
-    Uses the representative arch set by default; set KCONFIGLIB_OBSESSIVE=1
-    for full coverage.
+    Parametrized by mode and architecture (e.g.
+    ``-k "test_allconfig[allnoconfig-x86_64]"``).  Uses the representative
+    arch set by default; set KCONFIGLIB_OBSESSIVE=1 for full coverage.
     """
-    for arch, srcarch in _DEFAULT_PAIRS:
-        os.environ["ARCH"] = arch
-        os.environ["SRCARCH"] = srcarch
-        rm_configs()
-        run_conf_and_compare(script, conf_flag, arch)
+    os.environ["ARCH"] = arch
+    os.environ["SRCARCH"] = srcarch
+    rm_configs()
+    run_conf_and_compare(script, conf_flag, arch)
 
 
 @pytest.mark.parametrize(
     "arch,srcarch",
     _DEFAULT_PAIRS,
     ids=[a for a, _ in _DEFAULT_PAIRS],
+    scope="session",
 )
-def test_defconfig(arch, srcarch):
+def test_defconfig(arch_kconf, arch, srcarch):
     """Verify that Kconfiglib generates the same .config as
     scripts/kconfig/conf, for each defconfig in the given architecture.
 
@@ -359,21 +439,19 @@ def test_defconfig(arch, srcarch):
     cross-arch defconfig combinations.  With KCONFIGLIB_LOG=1, failures
     are appended to test_defconfig_fails in the kernel root.
     """
+    # Another architecture may have been selected since arch_kconf was set
+    # up, and the C tools read ARCH and SRCARCH from the environment
     os.environ["ARCH"] = arch
     os.environ["SRCARCH"] = srcarch
-    rm_configs()
-
-    try:
-        kconf = Kconfig()
-    except KconfigError:
-        pytest.skip(f"Kconfig parsing failed for {arch}")
+    kconf = arch_kconf
 
     for defconfig in collect_defconfigs(srcarch, obsessive):
         rm_configs()
 
         kconf.load_config(defconfig)
-        kconf.write_config("._config")
-        shell(f"scripts/kconfig/conf --defconfig='{defconfig}' Kconfig")
+        # ._config was just removed, so there is nothing to back up
+        kconf.write_config("._config", save_old=False)
+        shell(["scripts/kconfig/conf", f"--defconfig={defconfig}", "Kconfig"])
 
         label = f"  {arch:14}with {defconfig:60} "
 
@@ -390,8 +468,9 @@ def test_defconfig(arch, srcarch):
     "arch,srcarch",
     _MIN_CONFIG_PAIRS,
     ids=[a for a, _ in _MIN_CONFIG_PAIRS],
+    scope="session",
 )
-def test_min_config(arch, srcarch):
+def test_min_config(arch_kconf, arch, srcarch):
     """Verify that Kconfiglib generates the same .config as
     'make savedefconfig' for each defconfig in the given architecture.
 
@@ -399,14 +478,11 @@ def test_min_config(arch, srcarch):
     the representative arch set or KCONFIGLIB_OBSESSIVE=1 for all
     architectures.
     """
+    # Another architecture may have been selected since arch_kconf was set
+    # up, and the C tools read ARCH and SRCARCH from the environment
     os.environ["ARCH"] = arch
     os.environ["SRCARCH"] = srcarch
-    rm_configs()
-
-    try:
-        kconf = Kconfig()
-    except KconfigError:
-        pytest.skip(f"Kconfig parsing failed for {arch}")
+    kconf = arch_kconf
 
     for defconfig in collect_defconfigs(srcarch, min_config_full or obsessive):
         rm_configs()
@@ -415,7 +491,7 @@ def test_min_config(arch, srcarch):
         kconf.write_min_config("._config")
 
         shutil.copyfile(defconfig, ".config")
-        shell("scripts/kconfig/conf --savedefconfig=.config Kconfig")
+        shell(["scripts/kconfig/conf", "--savedefconfig=.config", "Kconfig"])
 
         label = f"  {arch:14}with {defconfig:60} "
 
@@ -430,8 +506,9 @@ def test_min_config(arch, srcarch):
     "arch,srcarch",
     _DEFAULT_PAIRS,
     ids=[a for a, _ in _DEFAULT_PAIRS],
+    scope="session",
 )
-def test_sanity(arch, srcarch):
+def test_sanity(arch_kconf, arch, srcarch):
     """Do sanity checks on the given architecture and call all public methods
     on all symbols, choices, and menu nodes to make sure we never crash or
     hang.
@@ -439,47 +516,29 @@ def test_sanity(arch, srcarch):
     Parametrized by architecture.  Set KCONFIGLIB_OBSESSIVE=1 for all
     architectures.
     """
-    os.environ["ARCH"] = arch
-    os.environ["SRCARCH"] = srcarch
-    rm_configs()
-
     print(f"For {arch}...")
 
-    try:
-        kconf = Kconfig()
-    except KconfigError:
-        pytest.skip(f"Kconfig parsing failed for {arch}")
-
-    for sym in kconf.defined_syms:
-        assert sym._visited == 2, (
-            f"{sym.name} has broken dependency loop detection "
-            f"(_visited = {sym._visited})"
-        )
+    # Also checks dependency loop detection, if the tree wasn't parsed yet
+    kconf = arch_kconf
 
     kconf.modules
     kconf.defconfig_list
     kconf.defconfig_filename
 
-    # Exercise warning attribute toggles
-    kconf.warn_assign_redun = True
+    # Exercise warning attribute toggles. Each ends at its default, as the
+    # Kconfig instance is shared with other tests.
     kconf.warn_assign_redun = False
+    kconf.warn_assign_redun = True
     kconf.warn_assign_undef = True
     kconf.warn_assign_undef = False
-    kconf.warn = True
     kconf.warn = False
-    kconf.warn_to_stderr = True
+    kconf.warn = True
     kconf.warn_to_stderr = False
+    kconf.warn_to_stderr = True
 
     kconf.mainmenu_text
     kconf.unset_values()
 
-    kconf.write_autoconf("/dev/null")
-
-    tmpdir = tempfile.mkdtemp()
-    kconf.sync_deps(os.path.join(tmpdir, "deps"))  # Create
-    kconf.sync_deps(os.path.join(tmpdir, "deps"))  # Update
-    shutil.rmtree(tmpdir)
-
     # -- Verify non-constant symbols (kconf.syms) --
 
     for key, sym in kconf.syms.items():
@@ -567,3 +626,26 @@ def test_sanity(arch, srcarch):
                     break
             else:
                 break
+
+
+@pytest.mark.parametrize(
+    "arch,srcarch",
+    _SANITY_IO_PAIRS,
+    ids=[a for a, _ in _SANITY_IO_PAIRS],
+    scope="session",
+)
+def test_sanity_io(arch_kconf, arch, srcarch):
+    """Make sure writing a header and syncing dependency files never
+    crashes or hangs.
+
+    Split out of test_sanity and limited to the representative arch set,
+    as these walk and write out the whole tree.
+    """
+    kconf = arch_kconf
+
+    kconf.write_autoconf("/dev/null")
+
+    tmpdir = tempfile.mkdtemp()
+    kconf.sync_deps(os.path.join(tmpdir, "deps"))  # Create
+    kconf.sync_deps(os.path.join(tmpdir, "deps"))  # Update
+    shutil.rmtree(tmpdir)
@@ -131,8 +131,15 @@ def test_deploop_detection():
 # -- Symbol.rev_dep (select) -------------------------------------------------
 
 
-def test_rev_dep():
-    c = Kconfig("tests/Krevdep", warn=False)
+@pytest.fixture(scope="module")
+def krevdep():
+    """tests/Krevdep, parsed once for the rev_dep and weak_rev_dep tests,
+    which only inspect it."""
+    return Kconfig("tests/Krevdep", warn=False)
+
+
+def test_rev_dep(krevdep):
+    c = krevdep
 
     # Symbol with no selectors: rev_dep is the constant 'n'
     assert expr_str(c.syms["PLAIN"].rev_dep) == "n"
@@ -150,8 +157,8 @@ def test_rev_dep():
 # -- Symbol.weak_rev_dep (imply) ---------------------------------------------
 
 
-def test_weak_rev_dep():
-    c = Kconfig("tests/Krevdep", warn=False)
+def test_weak_rev_dep(krevdep):
+    c = krevdep
 
     # Symbol with no impliers: weak_rev_dep is 'n'
     assert expr_str(c.syms["PLAIN"].weak_rev_dep) == "n"
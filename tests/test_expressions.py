@@ -51,16 +51,28 @@ def _verify_split(c, cases, op):
 # ---------------------------------------------------------------------------
 
 
-def test_eval_no_modules():
+@pytest.fixture(scope="module")
+def keval():
+    """tests/Keval with modules enabled, parsed once for the evaluation
+    tests. Tests that change MODULES restore it."""
     c = Kconfig("tests/Keval", warn=False)
+    c.modules.set_value(2)
+    return c
 
-    _eval(c, "n", 0)
-    _eval(c, "m", 0)
-    _eval(c, "y", 2)
-    _eval(c, "'n'", 0)
-    _eval(c, "'m'", 0)
-    _eval(c, "'y'", 2)
-    _eval(c, "M", 2)
+
+def test_eval_no_modules(keval):
+    c = keval
+    c.modules.set_value(0)
+    try:
+        _eval(c, "n", 0)
+        _eval(c, "m", 0)
+        _eval(c, "y", 2)
+        _eval(c, "'n'", 0)
+        _eval(c, "'m'", 0)
+        _eval(c, "'y'", 2)
+        _eval(c, "M", 2)
+    finally:
+        c.modules.set_value(2)
 
 
 # ---------------------------------------------------------------------------
@@ -68,9 +80,8 @@ def test_eval_no_modules():
 # ---------------------------------------------------------------------------
 
 
-def test_eval_with_modules():
-    c = Kconfig("tests/Keval", warn=False)
-    c.modules.set_value(2)
+def test_eval_with_modules(keval):
+    c = keval
 
     # Basic tristate
     _eval(c, "n", 0)
@@ -266,13 +277,10 @@ _BAD_EXPRS = [
 ]
 
 
-def test_eval_bad():
-    c = Kconfig("tests/Keval", warn=False)
-    c.modules.set_value(2)
-
-    for expr in _BAD_EXPRS:
-        with pytest.raises(KconfigError):
-            c.eval_string(expr)
+@pytest.mark.parametrize("expr", _BAD_EXPRS)
+def test_eval_bad(keval, expr):
+    with pytest.raises(KconfigError):
+        keval.eval_string(expr)
 
 
 # ---------------------------------------------------------------------------
@@ -353,9 +361,8 @@ def test_expr_items():
 # ---------------------------------------------------------------------------
 
 
-def test_expr_value():
-    c = Kconfig("tests/Keval", warn=False)
-    c.modules.set_value(2)
+def test_expr_value(keval):
+    c = keval
 
     # Direct symbol tristate values
     assert expr_value(c.syms["N"]) == 0
@@ -3,6 +3,8 @@
 #
 # Imply and choice semantics tests.
 
+import pytest
+
 from kconfiglib import Kconfig, BOOL, TRISTATE
 from conftest import (
     verify_value,
@@ -112,8 +114,17 @@ def test_imply_user_values():
 # ---------------------------------------------------------------------------
 
 
-def test_choice_types():
-    c = Kconfig("tests/Kchoice", warn=False)
+@pytest.fixture(scope="module")
+def kchoice():
+    """tests/Kchoice, parsed once for the tests that only inspect it.
+
+    Tests that assign values parse their own instance.
+    """
+    return Kconfig("tests/Kchoice", warn=False)
+
+
+def test_choice_types(kchoice):
+    c = kchoice
 
     for name in "BOOL", "BOOL_OPT", "BOOL_M", "DEFAULTS":
         assert c.named_choices[name].orig_type == BOOL, f"choice {name} type"
@@ -230,8 +241,8 @@ def test_choice_m_mode():
     verify_value(c, "T_2", 2)
 
 
-def test_choice_no_explicit_type():
-    c = Kconfig("tests/Kchoice", warn=False)
+def test_choice_no_explicit_type(kchoice):
+    c = kchoice
 
     assert (
         c.named_choices["NO_TYPE_BOOL"].orig_type == BOOL
@@ -242,8 +253,8 @@ def test_choice_no_explicit_type():
     ), "Expected second choice without explicit type to have type tristate"
 
 
-def test_choice_symbol_types():
-    c = Kconfig("tests/Kchoice", warn=False)
+def test_choice_symbol_types(kchoice):
+    c = kchoice
 
     for name in "MMT_1", "MMT_2", "MMT_4", "MMT_5":
         assert c.syms[name].orig_type == BOOL, f"{name} type"
@@ -264,8 +275,8 @@ def test_choice_default_with_dep():
     assert choice.selection is c.syms["B"], "choice default with unsatisfied deps again"
 
 
-def test_choice_weird_symbols():
-    c = Kconfig("tests/Kchoice", warn=False)
+def test_choice_weird_symbols(kchoice):
+    c = kchoice
 
     weird_choice = c.named_choices["WEIRD_SYMS"]
 